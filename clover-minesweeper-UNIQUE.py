@@ -11,10 +11,16 @@ Pure OpenGL/GLUT Implementation - UNIQUE PROBLEMS VERSION
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
-import random
 import math
 import time
 
+from clover_engine import DESTRUCTION_DURATION, Game
+from clover_frames import FramePacer
+from clover_render import CloudLayer, CubeRenderer, DisplayList, GrassField
+from clover_text import TextRenderer
+from clover_journal import Journal, Replayer
+from clover_save import SnapshotError, load_game, save_game
+
 # Game Configuration
 GRID_WIDTH = 10
 GRID_HEIGHT = 10
@@ -22,6 +28,10 @@ GRID_DEPTH = 1 # Start with 1 layer
 CUBE_SIZE = 50
 CUBE_SPACING = 60
 MINE_PERCENTAGE = 0.15
+MINE_SEED = None # Set to an int for reproducible mine layouts
+NO_GUESS = False # Only deal boards that can be cleared from the center without guessing
+PREGENERATE = "thread" # Mine the next layer in the background: "thread", "process" (big no-guess boards) or None
+PLAYER_NAME = "player" # Used problems are remembered per player across sessions (None: this session only)
 
 # Camera variables
 camera_pos = [300, 500, 800]
@@ -31,64 +41,46 @@ camera_angle_v = 30
 fovY = 60
 first_person = False
 
-# Game state
-grid = []
-mines_count = 0
-flags_count = 0
-safe_cubes_revealed = 0
-total_safe_cubes = 0
-game_over = False
-level_complete = False
-current_layer = 0
-total_layers = 5
-score = 0
-scanner_uses = 3
-selected_cube = None
+TOTAL_LAYERS = 5
+SCANNER_USES = 3
+MINI_GAME_TIME_LIMIT = 5
+SAVE_PATH = "clover_save.clv" # F5 saves the game here, F9 loads it
+ADAPTIVE_MINI_GAME = False # Adapt the time limit and problem difficulty to the player's response times
+JOURNAL_PATH = "clover_journal.jsonl" # Every input is journaled here for replay (None: off)
+REPLAY_PATH = None # Set to a journal to watch it replayed in real time instead of playing
+FRAME_CAP = 60 # Max frames per second (None: as fast as buffer swaps allow, e.g. vsync)
+IDLE_FPS = 10 # Frame rate after a few seconds without input or game animation
+
+# Game state - rules and state live in the headless engine (see clover_engine.py)
+game = None
 hover_cube = None
-
-# Selection state
-selection_x = 0
-selection_y = 0
-
-# Visual effects
-pulse_time = 0
-destruction_animations = []
-congrats_animation_start = 0
-mines_revealed = False
-cloud_time = 0
-
-# Mini-game state - With transparent background and UNIQUE PROBLEMS
-mini_game_active = False
-mini_game_problem = ""
-mini_game_answer = 0
-mini_game_input = ""
-mini_game_start_time = 0
-mini_game_time_limit = 5
-
-# UNIQUE PROBLEMS TRACKING
-used_problems = set()  # Track problems that have been used
+replayer = None # Drives `game` from a journal when REPLAY_PATH is set
+
+# Visual effects - scenery animates on a fixed tick, independent of the frame rate
+CLOUD_SPEED = 1.2 # Cloud drift phase per second
+frames = FramePacer(frame_cap=FRAME_CAP, idle_fps=IDLE_FPS)
+cube_renderer = CubeRenderer(CUBE_SIZE, DESTRUCTION_DURATION) # All cubes in a few batched draw calls
+text_renderer = TextRenderer(1200, 800) # UI text from a glyph atlas, one draw call per frame
+GRASS_BLADES = 150 # Blades scattered around the platform (thousands cost about the same)
+grass = GrassField(GRID_WIDTH * CUBE_SPACING, GRID_HEIGHT * CUBE_SPACING, GRASS_BLADES)
+DISTANT_CLOUDS = 40 # Billboard clouds in a ring around the board
+clouds = CloudLayer([
+    # Positioned around the game board for visibility
+    (GRID_WIDTH * CUBE_SPACING / 2 - 150, 200, -100),  # Left of board
+    (GRID_WIDTH * CUBE_SPACING / 2 + 150, 180, -80),   # Right of board
+    (GRID_WIDTH * CUBE_SPACING / 2, 250, 100),         # Above board
+    (GRID_WIDTH * CUBE_SPACING / 2 - 100, 220, 150),   # Above-left
+    (GRID_WIDTH * CUBE_SPACING / 2 + 100, 190, 120),   # Above-right
+    (-50, 160, 50),                                     # Far left
+    (GRID_WIDTH * CUBE_SPACING + 50, 170, 80),         # Far right
+], DISTANT_CLOUDS, center=(GRID_WIDTH * CUBE_SPACING / 2, GRID_HEIGHT * CUBE_SPACING / 2))
+window_visible = True
 
 # Mouse state
 mouse_x = 0
 mouse_y = 0
 mouse_pressed = False
 
-class Cube:
-    def __init__(self, x, y, z):
-        self.grid_x = x
-        self.grid_y = y
-        self.grid_z = z
-        self.has_mine = False
-        self.revealed = False
-        self.flagged = False
-        self.adjacent_mines = 0
-        self.hover = False
-        self.destruction_time = 0
-        self.mine_revealed = False # For hack mode
-        self.world_x = x * CUBE_SPACING
-        self.world_y = -z * CUBE_SPACING * 3 # Layers stacked vertically
-        self.world_z = y * CUBE_SPACING
-
 def get_cube_at_position(x, y):
     """ULTIMATE PRECISION mouse selection with advanced algorithms"""
     try:
@@ -172,216 +164,24 @@ def get_cube_at_position(x, y):
             if cube and not cube.revealed:
                 return cube
 
-        # ULTIMATE fallback: Intelligent proximity search with distance weighting
-        best_cube = None
-        best_distance = float('inf')
+        # ULTIMATE fallback: nearest unrevealed cube from the spatial index (any distance)
 
         # Calculate average candidate position for search center
         avg_x = sum(max(0, min(GRID_WIDTH - 1, gx)) for gx, gy, w in candidates) / len(candidates)
         avg_y = sum(max(0, min(GRID_HEIGHT - 1, gy)) for gx, gy, w in candidates) / len(candidates)
 
-        search_center_x = int(avg_x)
-        search_center_y = int(avg_y)
-
-        # Expand search with distance-based scoring
-        for radius in [1, 2, 3, 4]:  # Expanded search radius
-            for dy in range(-radius, radius + 1):
-                for dx in range(-radius, radius + 1):
-                    if dx == 0 and dy == 0:
-                        continue
-
-                    test_x = search_center_x + dx
-                    test_y = search_center_y + dy
-
-                    # Skip out of bounds
-                    if not (0 <= test_x < GRID_WIDTH and 0 <= test_y < GRID_HEIGHT):
-                        continue
-
-                    cube = get_cube_at_grid_position(test_x, test_y)
-                    if cube and not cube.revealed:
-                        # Calculate distance to mouse target
-                        distance = math.sqrt(dx*dx + dy*dy)
-
-                        # Prefer closer cubes
-                        if distance < best_distance:
-                            best_distance = distance
-                            best_cube = cube
-
-        return best_cube
+        return game.nearest_unrevealed(int(avg_x), int(avg_y))
 
     except Exception as e:
         return None
 
 def get_cube_at_grid_position(grid_x, grid_y):
     """Get cube at specific grid coordinates"""
-    if 0 <= grid_x < GRID_WIDTH and 0 <= grid_y < GRID_HEIGHT:
-        return grid[0][grid_y][grid_x]
-    return None
-
-def find_next_unrevealed_cube(start_x, start_y, dx, dy):
-    """Find the next unrevealed cube in a given direction"""
-    x, y = start_x, start_y
-    for _ in range(max(GRID_WIDTH, GRID_HEIGHT)): # Maximum possible moves
-        x += dx
-        y += dy
-
-        # Wrap around boundaries
-        if x < 0:
-            x = GRID_WIDTH - 1
-        elif x >= GRID_WIDTH:
-            x = 0
-
-        if y < 0:
-            y = GRID_HEIGHT - 1
-        elif y >= GRID_HEIGHT:
-            y = 0
-
-        cube = get_cube_at_grid_position(x, y)
-        if cube and not cube.revealed:
-            return x, y, cube
-
-    # If all cubes are revealed, return current position
-    return start_x, start_y, get_cube_at_grid_position(start_x, start_y)
-
-def move_selection(dx, dy):
-    """Smart movement that skips revealed cubes"""
-    global selection_x, selection_y, selected_cube
-
-    # Find next unrevealed cube
-    new_x, new_y, new_cube = find_next_unrevealed_cube(selection_x, selection_y, dx, dy)
-
-    selection_x = new_x
-    selection_y = new_y
-    selected_cube = new_cube
-
-    if selected_cube:
-        print(f"→ Moved to cube ({selection_x}, {selection_y})")
-
-def init_grid():
-    global grid, mines_count, flags_count, safe_cubes_revealed, total_safe_cubes
-    global selection_x, selection_y, selected_cube, mines_revealed
-
-    grid = []
-    mines_count = int(GRID_WIDTH * GRID_HEIGHT * MINE_PERCENTAGE)
-    flags_count = 0
-    safe_cubes_revealed = 0
-    mines_revealed = False
-
-    # Reset selection to center
-    selection_x = GRID_WIDTH // 2
-    selection_y = GRID_HEIGHT // 2
-
-    # Create grid for current layer
-    layer = []
-    for y in range(GRID_HEIGHT):
-        row = []
-        for x in range(GRID_WIDTH):
-            cube = Cube(x, y, 0)
-            row.append(cube)
-        layer.append(row)
-    grid.append(layer)
-
-    # Place mines randomly
-    mines_placed = 0
-    while mines_placed < mines_count:
-        x = random.randint(0, GRID_WIDTH - 1)
-        y = random.randint(0, GRID_HEIGHT - 1)
-        if not grid[0][y][x].has_mine:
-            grid[0][y][x].has_mine = True
-            mines_placed += 1
-
-    # Calculate adjacent mines
-    calculate_adjacent_mines()
-
-    # Calculate total safe cubes
-    total_safe_cubes = GRID_WIDTH * GRID_HEIGHT - mines_count
-
-    # Set initial selected cube
-    selected_cube = get_cube_at_grid_position(selection_x, selection_y)
-
-def calculate_adjacent_mines():
-    for z in range(len(grid)):
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                if not grid[z][y][x].has_mine:
-                    count = 0
-                    # Check all 8 adjacent cubes (for 2D layer)
-                    for dy in [-1, 0, 1]:
-                        for dx in [-1, 0, 1]:
-                            if dx == 0 and dy == 0:
-                                continue
-                            ny, nx = y + dy, x + dx
-                            if 0 <= ny < GRID_HEIGHT and 0 <= nx < GRID_WIDTH:
-                                if grid[z][ny][nx].has_mine:
-                                    count += 1
-                    grid[z][y][x].adjacent_mines = count
-
-def generate_unique_problem():
-    """Generate a unique math problem that hasn't been used before"""
-    global used_problems
-
-    max_attempts = 1000  # Prevent infinite loop if all problems are exhausted
-    attempts = 0
-
-    while attempts < max_attempts:
-        # Generate random math problem
-        a = random.randint(1, 25)  # Slightly larger range for more variety
-        b = random.randint(1, 25)
-        op = random.choice(['+', '-', '*'])
-
-        # Create problem string and answer
-        if op == '+':
-            problem = f"{a} + {b} = ?"
-            answer = a + b
-        elif op == '-':
-            # Ensure no negative results
-            if a < b:
-                a, b = b, a  # Swap to ensure positive result
-            problem = f"{a} - {b} = ?"
-            answer = a - b
-        else:  # multiplication
-            problem = f"{a} x {b} = ?"
-            answer = a * b
-
-        # Create unique identifier for this problem
-        problem_id = f"{a},{op},{b}"
-
-        # Check if this problem has been used before
-        if problem_id not in used_problems:
-            used_problems.add(problem_id)
-            print(f"🆕 Generated NEW unique problem: {problem} (ID: {problem_id})")
-            print(f"📊 Total unique problems used: {len(used_problems)}")
-            return problem, answer
-
-        attempts += 1
-
-    # Fallback: If somehow all problems are exhausted, clear the set and start over
-    print("🔄 All problems exhausted! Clearing used problems set...")
-    used_problems.clear()
-    return generate_unique_problem()
+    return game.cube_at(grid_x, grid_y)
 
 def draw_text(x, y, text, font=GLUT_BITMAP_HELVETICA_18):
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix()
-    glLoadIdentity()
-
-    # Set up orthographic projection
-    gluOrtho2D(0, 1200, 0, 800)
-
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix()
-    glLoadIdentity()
-
-    # Draw text
-    glRasterPos2f(x, y)
-    for ch in text:
-        glutBitmapCharacter(font, ord(ch))
-
-    # Restore matrices
-    glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
+    """Queue text at window position (x, y) in the current color (drawn by text.end())"""
+    text_renderer.draw(x, y, text, font)
 
 def draw_sky():
     """Draw beautiful gradient sky"""
@@ -420,237 +220,19 @@ def draw_sky():
     glEnable(GL_DEPTH_TEST)
 
 def draw_clouds():
-    """Draw visible clouds close to the board"""
-    global cloud_time
-    cloud_time += 0.02
-
+    """Draw visible clouds close to the board, and distant ones as impostors"""
     glEnable(GL_LIGHTING)
     glEnable(GL_BLEND)
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
-    # Draw clouds positioned around and above the game board
-    cloud_positions = [
-        # Positioned around the game board for visibility
-        (GRID_WIDTH * CUBE_SPACING / 2 - 150, 200, -100),  # Left of board
-        (GRID_WIDTH * CUBE_SPACING / 2 + 150, 180, -80),   # Right of board
-        (GRID_WIDTH * CUBE_SPACING / 2, 250, 100),         # Above board
-        (GRID_WIDTH * CUBE_SPACING / 2 - 100, 220, 150),   # Above-left
-        (GRID_WIDTH * CUBE_SPACING / 2 + 100, 190, 120),   # Above-right
-        (-50, 160, 50),                                     # Far left
-        (GRID_WIDTH * CUBE_SPACING + 50, 170, 80),         # Far right
-    ]
-
-    for i, (base_x, base_y, base_z) in enumerate(cloud_positions):
-        glPushMatrix()
-
-        # Animate cloud movement
-        x_drift = base_x + math.sin(cloud_time + i * 0.8) * 30
-        y_drift = base_y + math.cos(cloud_time * 0.3 + i) * 15
-        z_drift = base_z + math.sin(cloud_time * 0.5 + i) * 20
-
-        glTranslatef(x_drift, y_drift, z_drift)
-
-        # Cloud color with varying transparency
-        alpha = 0.8 + 0.2 * math.sin(cloud_time * 1.5 + i)
-        glColor4f(0.95, 0.95, 1.0, alpha)  # Slightly blue-tinted white
-
-        # Draw cloud as multiple overlapping spheres
-        cloud_parts = [
-            (0, 0, 0, 25),        # Center
-            (15, 5, 8, 20),       # Right
-            (-12, 3, -5, 22),     # Left
-            (8, -6, 12, 18),      # Bottom-right
-            (-6, 8, -8, 19),      # Top-left
-            (20, -2, 15, 16),     # Far right
-            (-18, 6, 10, 17),     # Far left
-        ]
-
-        for (ox, oy, oz, radius) in cloud_parts:
-            glPushMatrix()
-            glTranslatef(ox, oy, oz)
-            glutSolidSphere(radius, 12, 8)
-            glPopMatrix()
-
-        glPopMatrix()
+    clouds.draw(frames.time * CLOUD_SPEED)
 
     glDisable(GL_BLEND)
 
 def draw_grass():
     """Draw grass around the platform"""
     glEnable(GL_LIGHTING)
-
-    # Grass field parameters
-    grass_range = 400 # Reduced range for better performance
-    grass_density = 150
-    random.seed(42) # Consistent grass positions
-
-    for i in range(grass_density):
-        # Random grass position
-        x = random.uniform(-grass_range, GRID_WIDTH * CUBE_SPACING + grass_range)
-        z = random.uniform(-grass_range, GRID_HEIGHT * CUBE_SPACING + grass_range)
-
-        # Skip grass on the platform
-        if (-50 <= x <= GRID_WIDTH * CUBE_SPACING + 50 and
-            -50 <= z <= GRID_HEIGHT * CUBE_SPACING + 50):
-            continue
-
-        # Grass blade parameters
-        height = random.uniform(12, 30)
-        sway = math.sin(time.time() * 1.5 + i * 0.1) * 3 # Gentle wind effect
-
-        glPushMatrix()
-        glTranslatef(x + sway, -30, z)
-
-        # Grass color variation
-        green_var = random.uniform(0.4, 0.7)
-        glColor3f(0.1, green_var, 0.1)
-
-        # Draw grass blade as a thin rectangle
-        glBegin(GL_QUADS)
-        glVertex3f(-0.8, 0, 0)
-        glVertex3f(0.8, 0, 0)
-        glVertex3f(0.8, height, 0)
-        glVertex3f(-0.8, height, 0)
-        glEnd()
-
-        glPopMatrix()
-
-def get_cube_color(cube):
-    """Get colorful cube colors based on state with enhanced selection brightness"""
-    if cube.flagged:
-        return (1.0, 0.2, 0.2) # Bright red for flagged
-    elif cube.revealed:
-        if cube.has_mine:
-            return (0.8, 0.0, 0.0) # Dark red for mine
-        else:
-            # Colorful gradient based on adjacent mines
-            mine_colors = [
-                (0.2, 0.8, 0.2), # 0 mines - bright green
-                (0.3, 0.7, 0.4), # 1 mine - green
-                (0.4, 0.6, 0.5), # 2 mines - yellow-green
-                (0.6, 0.6, 0.2), # 3 mines - yellow
-                (0.7, 0.5, 0.1), # 4 mines - orange
-                (0.8, 0.4, 0.0), # 5 mines - orange-red
-                (0.9, 0.2, 0.0), # 6 mines - red
-                (1.0, 0.1, 0.1), # 7 mines - bright red
-                (1.0, 0.0, 0.2), # 8 mines - crimson
-            ]
-            if cube.adjacent_mines < len(mine_colors):
-                return mine_colors[cube.adjacent_mines]
-            else:
-                return (1.0, 0.0, 0.0)
-    elif cube.mine_revealed: # Hack mode - show mines
-        return (0.6, 0.1, 0.8) # Purple for revealed mines
-    elif cube.hover:
-        return (0.4, 1.0, 0.4) # Bright green for hover
-    elif cube == selected_cube:
-        # MUCH BRIGHTER pulsing selection
-        pulse = 0.8 + 0.2 * math.sin(time.time() * 8) # Faster, brighter pulse
-        return (1.0, 1.0, pulse) # Bright white-yellow
-    else:
-        # Colorful unrevealed cubes with subtle variation
-        base_hue = (cube.grid_x * 0.1 + cube.grid_y * 0.15) % 1.0
-        if base_hue < 0.33:
-            return (0.3 + base_hue, 0.4, 0.7) # Blue spectrum
-        elif base_hue < 0.66:
-            return (0.4, 0.3 + base_hue, 0.6) # Purple spectrum
-        else:
-            return (0.5, 0.4, 0.3 + base_hue) # Teal spectrum
-
-def draw_cube(cube):
-    glPushMatrix()
-    glTranslatef(cube.world_x, cube.world_y, cube.world_z)
-
-    # Handle destruction animation
-    if cube.destruction_time > 0:
-        elapsed = time.time() - cube.destruction_time
-        if elapsed > 1.0:
-            glPopMatrix()
-            return
-        scale = 1.0 - elapsed
-        glScalef(scale, scale, scale)
-        glRotatef(elapsed * 360, 1, 1, 1)
-
-    # ENHANCED SELECTION GLOW EFFECT
-    if cube == selected_cube:
-        # Draw glowing outer shell
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-
-        pulse = 0.7 + 0.3 * math.sin(time.time() * 10) # Fast pulse
-        glColor4f(1.0, 1.0, 0.8, pulse * 0.5) # Semi-transparent glow
-        glutSolidCube(CUBE_SIZE * 1.3) # Larger glowing cube
-
-        glDisable(GL_BLEND)
-
-    # Set cube color based on state
-    color = get_cube_color(cube)
-    glColor3f(*color)
-
-    # Draw solid cube
-    glutSolidCube(CUBE_SIZE)
-
-    # Draw wireframe outline with enhanced brightness for selection
-    if cube == selected_cube:
-        glColor3f(1.0, 1.0, 1.0) # Bright white outline for selected
-        glLineWidth(4.0)
-    elif cube.revealed:
-        glColor3f(0.2, 0.2, 0.2) # Dark gray for revealed
-        glLineWidth(1.0)
-    else:
-        glColor3f(0.1, 0.1, 0.1) # Very dark outline
-        glLineWidth(2.0)
-
-    glutWireCube(CUBE_SIZE + 1)
-
-    # Draw adjacent mine indicators (colorful clover leaves)
-    if cube.revealed and not cube.has_mine and cube.adjacent_mines > 0:
-        # Color-coded clover leaves
-        leaf_colors = [
-            (1.0, 1.0, 0.0), # Yellow
-            (0.0, 1.0, 0.0), # Green
-            (0.0, 0.5, 1.0), # Blue
-            (1.0, 0.5, 0.0), # Orange
-            (1.0, 0.0, 0.5), # Pink
-            (0.5, 0.0, 1.0), # Purple
-            (1.0, 0.0, 0.0), # Red
-            (0.0, 1.0, 1.0), # Cyan
-        ]
-
-        for i in range(cube.adjacent_mines):
-            color_idx = i % len(leaf_colors)
-            glColor3f(*leaf_colors[color_idx])
-
-            angle = (360.0 / cube.adjacent_mines) * i
-            x_offset = 15 * math.cos(math.radians(angle))
-            z_offset = 15 * math.sin(math.radians(angle))
-
-            glPushMatrix()
-            glTranslatef(x_offset, CUBE_SIZE/2 + 5, z_offset)
-            glutSolidSphere(4, 8, 8)
-            glPopMatrix()
-
-    # Draw mine indicator for hack mode
-    if cube.mine_revealed and cube.has_mine and not cube.revealed:
-        glColor3f(1.0, 0.3, 0.0) # Orange mine indicator
-        glPushMatrix()
-        glTranslatef(0, CUBE_SIZE/2 + 12, 0)
-        glutSolidSphere(6, 8, 8)
-        glPopMatrix()
-
-        # Add spikes to make it look more mine-like
-        glColor3f(0.8, 0.2, 0.0)
-        for i in range(6):
-            angle = i * 60
-            x_spike = 8 * math.cos(math.radians(angle))
-            z_spike = 8 * math.sin(math.radians(angle))
-
-            glPushMatrix()
-            glTranslatef(x_spike, CUBE_SIZE/2 + 12, z_spike)
-            glutSolidCube(3)
-            glPopMatrix()
-
-    glPopMatrix()
+    grass.draw(frames.time) # Gentle wind effect
 
 def draw_grid_platform():
     # Colorful platform/floor for the grid
@@ -694,13 +276,17 @@ def draw_grid_platform():
         glVertex3f(GRID_WIDTH * CUBE_SPACING, -29, z)
     glEnd()
 
+# Static scenery, recorded once into display lists
+sky = DisplayList(draw_sky)
+platform = DisplayList(draw_grid_platform)
+
 def draw_mini_game_with_background():
     """Draw mini-game with TRANSPARENT BACKGROUND for visibility"""
-    if not mini_game_active:
+    if not game.mini_game_active:
         return
 
-    elapsed = time.time() - mini_game_start_time
-    time_left = mini_game_time_limit - elapsed
+    time_left = game.mini_game_time_left()
+    elapsed = game.mini_game_time_limit - time_left
 
     # Enable blending for transparency
     glEnable(GL_BLEND)
@@ -757,15 +343,15 @@ def draw_mini_game_with_background():
     # MATH PROBLEM - Bright cyan, large text
     glColor3f(0.0, 1.0, 1.0)  # Bright cyan
     problem_x = 450 + 5 * math.sin(elapsed * 6)  # Slight floating effect
-    draw_text(int(problem_x), 590, mini_game_problem, GLUT_BITMAP_TIMES_ROMAN_24)
+    draw_text(int(problem_x), 590, game.mini_game_problem, GLUT_BITMAP_TIMES_ROMAN_24)
 
     # UNIQUE PROBLEM INDICATOR - Show problem count
     glColor3f(0.8, 0.8, 0.8)  # Light gray
-    draw_text(420, 570, f"Problem #{len(used_problems)}", GLUT_BITMAP_HELVETICA_12)
+    draw_text(420, 570, f"Problem #{game.problems_used}", GLUT_BITMAP_HELVETICA_12)
 
     # ANSWER INPUT - Bright green with background
     cursor_blink = int(elapsed * 3) % 2
-    answer_text = f"ANSWER: {mini_game_input}"
+    answer_text = f"ANSWER: {game.mini_game_input}"
     if cursor_blink:
         answer_text += "_"
 
@@ -823,7 +409,7 @@ def draw_mini_game_with_background():
         bar_x = 400
         bar_y = 480
 
-        progress = time_left / mini_game_time_limit if time_left > 0 else 0
+        progress = time_left / game.mini_game_time_limit if time_left > 0 else 0
         fill_width = bar_width * progress
 
         # Timer bar background
@@ -862,35 +448,16 @@ def draw_mini_game_with_background():
         glColor3f(1.0, 0.0, 0.0)
         draw_text(480, 500, "TIME'S UP!", GLUT_BITMAP_TIMES_ROMAN_24)
 
-        # Auto-handle timeout
-        if elapsed > mini_game_time_limit + 1:
-            handle_mini_game_result(False)
-
     # INSTRUCTIONS - Bright white at bottom of panel
     glColor3f(1.0, 1.0, 1.0)
     draw_text(420, 420, "Type answer and press ENTER to defuse", GLUT_BITMAP_HELVETICA_12)
 
-def start_mini_game():
-    global mini_game_active, mini_game_problem, mini_game_answer, mini_game_input, mini_game_start_time
-
-    mini_game_active = True
-    mini_game_input = ""
-    mini_game_start_time = time.time()
-
-    # Generate UNIQUE math problem
-    mini_game_problem, mini_game_answer = generate_unique_problem()
-
-    print(f"💎 UNIQUE MINI-GAME: {mini_game_problem}")
-    print(f"📊 This is unique problem #{len(used_problems)}")
-
 def draw_congrats_animation():
     """Draw colorful congratulations animation when level is complete"""
-    if not level_complete or congrats_animation_start == 0:
+    if not game.level_complete or game.congrats_animation_start == 0:
         return
 
-    elapsed = time.time() - congrats_animation_start
-    if elapsed > 3.0: # Animation duration
-        return
+    elapsed = game.clock() - game.congrats_animation_start
 
     # Rainbow animated text with fade-in
     alpha = min(1.0, elapsed * 2)
@@ -912,34 +479,34 @@ def draw_ui():
 
     # Color-coded stats
     glColor3f(1.0, 1.0, 0.0) # Yellow for score
-    draw_text(10, 740, f"Score: {score}")
+    draw_text(10, 740, f"Score: {game.score}")
 
     glColor3f(0.5, 1.0, 0.5) # Light green for layer
-    draw_text(10, 710, f"Layer: {current_layer + 1}/{total_layers}")
+    draw_text(10, 710, f"Layer: {game.current_layer + 1}/{game.total_layers}")
 
     glColor3f(1.0, 0.5, 0.5) # Light red for mines
-    draw_text(10, 680, f"Mines: {mines_count}")
+    draw_text(10, 680, f"Mines: {game.mines_count}")
 
     glColor3f(0.8, 0.8, 1.0) # Light blue for flags
-    draw_text(10, 650, f"Flags: {flags_count}")
+    draw_text(10, 650, f"Flags: {game.flags_count}")
 
     glColor3f(0.5, 1.0, 1.0) # Cyan for cubes
-    draw_text(10, 620, f"Safe Cubes: {safe_cubes_revealed}/{total_safe_cubes}")
+    draw_text(10, 620, f"Safe Cubes: {game.safe_cubes_revealed}/{game.total_safe_cubes}")
 
     glColor3f(1.0, 0.8, 0.2) # Gold for scanner
-    draw_text(10, 590, f"Scanner Uses: {scanner_uses}")
+    draw_text(10, 590, f"Scanner Uses: {game.scanner_uses}")
 
     # UNIQUE PROBLEMS COUNTER
     glColor3f(1.0, 0.0, 1.0) # Magenta for unique problems
-    draw_text(10, 560, f"Unique Problems Used: {len(used_problems)}")
+    draw_text(10, 560, f"Unique Problems Used: {game.problems_used}")
 
     # Draw selected cube info
-    if selected_cube:
+    if game.selected_cube:
         glColor3f(1.0, 1.0, 0.0)
-        draw_text(10, 530, f"Selected: ({selected_cube.grid_x}, {selected_cube.grid_y})")
+        draw_text(10, 530, f"Selected: ({game.selected_cube.grid_x}, {game.selected_cube.grid_y})")
 
     # Draw hack mode indicator
-    if mines_revealed:
+    if game.mines_revealed:
         glColor3f(1.0, 0.0, 1.0) # Magenta
         draw_text(10, 500, "HACK MODE: Mines Visible!")
 
@@ -963,7 +530,7 @@ def draw_ui():
     draw_mini_game_with_background()
 
     # Draw game over message
-    if game_over:
+    if game.game_over:
         # Game over with transparent background
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
@@ -983,280 +550,87 @@ def draw_ui():
         draw_text(500, 400, "GAME OVER!", GLUT_BITMAP_TIMES_ROMAN_24)
 
         glColor3f(1.0, 0.5, 0.5)
-        draw_text(480, 350, f"Final Score: {score}")
+        draw_text(480, 350, f"Final Score: {game.score}")
 
         glColor3f(0.8, 0.8, 0.8)
         draw_text(450, 300, "Press R to restart")
 
         # Show unique problems used
         glColor3f(1.0, 0.0, 1.0)
-        draw_text(420, 270, f"Unique Problems Used: {len(used_problems)}")
+        draw_text(420, 270, f"Unique Problems Used: {game.problems_used}")
 
     # Draw congratulations animation
     draw_congrats_animation()
 
-def reveal_cube(cube):
-    global safe_cubes_revealed, score, mini_game_active
-
-    if cube.flagged or cube.revealed or game_over:
-        return
-
-    cube.revealed = True
-    print(f"✓ Revealed cube at ({cube.grid_x}, {cube.grid_y})")
-
-    if cube.has_mine:
-        # Trigger mini-game with unique problems
-        mini_game_active = True
-        start_mini_game()
-        return
-
-    safe_cubes_revealed += 1
-    score += 10
-
-    # Auto-reveal adjacent safe cubes if this has 0 adjacent mines
-    if cube.adjacent_mines == 0:
-        auto_reveal_adjacent(cube)
-
-    # Check for level completion
-    if safe_cubes_revealed >= total_safe_cubes:
-        complete_level()
-
-def auto_reveal_adjacent(cube):
-    for dy in [-1, 0, 1]:
-        for dx in [-1, 0, 1]:
-            if dx == 0 and dy == 0:
-                continue
-
-            ny = cube.grid_y + dy
-            nx = cube.grid_x + dx
-
-            if 0 <= ny < GRID_HEIGHT and 0 <= nx < GRID_WIDTH:
-                next_cube = grid[cube.grid_z][ny][nx]
-                if not next_cube.revealed and not next_cube.has_mine:
-                    reveal_cube(next_cube)
-
-def flag_cube(cube):
-    global flags_count
-
-    if cube.revealed or game_over:
-        return
-
-    cube.flagged = not cube.flagged
-    if cube.flagged:
-        flags_count += 1
-        print(f"🚩 Flagged cube at ({cube.grid_x}, {cube.grid_y})")
-    else:
-        flags_count -= 1
-        print(f"🚩 Unflagged cube at ({cube.grid_x}, {cube.grid_y})")
-
-def use_scanner():
-    """Use scanner to reveal 3x3 area around selected cube"""
-    global scanner_uses, safe_cubes_revealed
-
-    if scanner_uses <= 0 or not selected_cube or game_over:
-        return
-
-    scanner_uses -= 1
-    print(f"📡 Scanner used at ({selected_cube.grid_x}, {selected_cube.grid_y}) - 3x3 area")
-
-    # Reveal 3x3 area around selected cube
-    revealed_count = 0
-    for dy in [-1, 0, 1]:
-        for dx in [-1, 0, 1]:
-            ny = selected_cube.grid_y + dy
-            nx = selected_cube.grid_x + dx
-
-            if 0 <= ny < GRID_HEIGHT and 0 <= nx < GRID_WIDTH:
-                scan_cube = grid[selected_cube.grid_z][ny][nx]
-                if not scan_cube.has_mine and not scan_cube.revealed:
-                    scan_cube.revealed = True
-                    safe_cubes_revealed += 1
-                    revealed_count += 1
-
-    print(f"📡 Scanner revealed {revealed_count} safe cubes")
-
-def toggle_hack_mode():
-    """Toggle hack mode to reveal/hide all mines"""
-    global mines_revealed
-
-    mines_revealed = not mines_revealed
-
-    # Update mine visibility
-    for row in grid[0]:
-        for cube in row:
-            cube.mine_revealed = mines_revealed and cube.has_mine
-
-    if mines_revealed:
-        print("🔍 HACK MODE: All mines revealed!")
-    else:
-        print("🔍 HACK MODE: Disabled")
-
-def cycle_selection():
-    """Cycle through unrevealed cubes only"""
-    global selected_cube, selection_x, selection_y
-
-    if not grid:
-        return
-
-    # Find all unrevealed cubes
-    unrevealed_cubes = []
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            cube = grid[0][y][x]
-            if not cube.revealed:
-                unrevealed_cubes.append((x, y, cube))
-
-    if not unrevealed_cubes:
-        return
-
-    # Find current selection index
-    current_index = -1
-    for i, (x, y, cube) in enumerate(unrevealed_cubes):
-        if cube == selected_cube:
-            current_index = i
-            break
-
-    # Move to next unrevealed cube
-    if current_index < len(unrevealed_cubes) - 1:
-        selection_x, selection_y, selected_cube = unrevealed_cubes[current_index + 1]
-    else:
-        selection_x, selection_y, selected_cube = unrevealed_cubes[0]
-
-    print(f"→ Cycled to unrevealed cube ({selection_x}, {selection_y})")
-
-def handle_mini_game_result(success):
-    global mini_game_active, game_over, score, safe_cubes_revealed
-
-    mini_game_active = False
-
-    if success:
-        # Successfully defused
-        score += 50
-        if selected_cube:
-            selected_cube.has_mine = False
-            selected_cube.revealed = True
-            safe_cubes_revealed += 1
-        print("💎 UNIQUE: Mine successfully defused!")
-    else:
-        # Failed to defuse
-        game_over = True
-        print("💎 UNIQUE: Mine detonated! Game Over!")
-
-def complete_level():
-    global level_complete, current_layer, score, congrats_animation_start
-
-    level_complete = True
-    score += 100
-    congrats_animation_start = time.time()
-    print(f"🎉 LEVEL {current_layer + 1} COMPLETE! Score bonus: +100")
-    print(f"📊 Total unique problems used this session: {len(used_problems)}")
-
-    # Trigger destruction animation
-    for row in grid[0]:
-        for cube in row:
-            cube.destruction_time = time.time()
-
-    # Move to next layer after animation
-    glutTimerFunc(3000, next_layer, 0) # Wait for congrats animation
-
-def next_layer(value):
-    global current_layer, level_complete, game_over, congrats_animation_start
-
-    current_layer += 1
-    congrats_animation_start = 0
-
-    if current_layer < total_layers:
-        init_grid()
-        level_complete = False
-        print(f"🔽 Descending to layer {current_layer + 1}...")
-    else:
-        # Game won!
-        game_over = True
-        score += 500
-        print("🏆 ALL LAYERS COMPLETE! You won the game!")
-        print(f"🎯 Final unique problems used: {len(used_problems)}")
-
-def reset_game():
-    global current_layer, score, game_over, level_complete, scanner_uses
-    global selected_cube, mines_revealed, congrats_animation_start, mini_game_active
-    global used_problems  # Reset unique problems tracking
-
-    current_layer = 0
-    score = 0
-    game_over = False
-    level_complete = False
-    scanner_uses = 3
-    selected_cube = None
-    mines_revealed = False
-    congrats_animation_start = 0
-    mini_game_active = False
-
-    # OPTION: Keep unique problems or reset them?
-    # Comment/uncomment the line below based on preference:
-    # used_problems.clear()  # Uncomment to reset unique problems on game reset
-
-    init_grid()
-    print("🔄 Game reset!")
-    if len(used_problems) > 0:
-        print(f"📊 Unique problems tracking continues: {len(used_problems)} used")
-    else:
-        print("📊 Unique problems tracking reset to 0")
-
 def keyboardListener(key, x, y):
-    global mini_game_input, first_person, camera_angle_h
+    global first_person, camera_angle_h
 
-    if mini_game_active:
+    if replayer and key != b'v':
+        return # Replays only take camera input
+
+    if game.mini_game_active:
         # Handle mini-game input
         if key == b'\r': # Enter key
-            try:
-                if int(mini_game_input) == mini_game_answer:
-                    print("✅ UNIQUE: Correct answer! Mine defused!")
-                    handle_mini_game_result(True)
-                else:
-                    print("❌ UNIQUE: Wrong answer! Mine detonated!")
-                    handle_mini_game_result(False)
-            except:
-                print("❌ UNIQUE: Invalid input! Mine detonated!")
-                handle_mini_game_result(False)
+            game.answer(game.mini_game_input)
         elif key == b'\x08': # Backspace
-            mini_game_input = mini_game_input[:-1]
+            game.erase_answer()
         elif key.isdigit() or key == b'-':
-            if len(mini_game_input) < 5:  # Limit input length
-                mini_game_input += key.decode()
+            game.type_answer(key.decode()) # Input length is limited by the engine
     else:
         # Normal game controls
-        if key == b' ' and selected_cube: # Space - reveal
-            reveal_cube(selected_cube)
-        elif key == b'f' and selected_cube: # F - flag
-            flag_cube(selected_cube)
+        if key == b' ' and game.selected_cube: # Space - reveal
+            game.reveal()
+        elif key == b'f' and game.selected_cube: # F - flag
+            game.flag()
         elif key == b'x': # X - scanner (3x3)
-            use_scanner()
+            game.scan()
         elif key == b'h': # H - hack mode
-            toggle_hack_mode()
+            game.toggle_hack_mode()
         elif key == b'v': # V - toggle camera view
             first_person = not first_person
             print(f"📹 Camera: {'First Person' if first_person else 'Third Person'}")
         elif key == b'r': # R - reset
-            reset_game()
+            game.reset()
+        elif key == b'z': # Z - undo
+            game.undo()
+        elif key == b'y': # Y - redo
+            game.redo()
         elif key == b'\t': # Tab - cycle selection (unrevealed only)
-            cycle_selection()
+            game.cycle_selection()
         # WASD movement (skip revealed cubes)
         elif key == b'w': # W - move up
-            move_selection(0, -1)
+            game.move_selection(0, -1)
         elif key == b's': # S - move down
-            move_selection(0, 1)
+            game.move_selection(0, 1)
         elif key == b'a': # A - move left
-            move_selection(-1, 0)
+            game.move_selection(-1, 0)
         elif key == b'd': # D - move right
-            move_selection(1, 0)
+            game.move_selection(1, 0)
 
-    glutPostRedisplay()
+    request_frame()
 
 def specialKeyListener(key, x, y):
-    global camera_pos, camera_angle_v, camera_angle_h
+    global camera_pos, camera_angle_v, camera_angle_h, game
 
     move_speed = 20
 
+    # Save / load
+    if replayer:
+        pass
+    elif key == GLUT_KEY_F5:
+        save_game(game, SAVE_PATH)
+        print(f"💾 Game saved to {SAVE_PATH}")
+    elif key == GLUT_KEY_F9:
+        try:
+            loaded = load_game(SAVE_PATH, log=print, pregenerate=PREGENERATE)
+            if game.journal:
+                game.journal.close()
+                print("📼 Journal stopped (loaded games are not journaled)")
+            game = loaded
+            print(f"📂 Game loaded from {SAVE_PATH}")
+        except (OSError, SnapshotError) as error:
+            print(f"❌ Could not load {SAVE_PATH}: {error}")
+
     # Camera movement
     if key == GLUT_KEY_UP:
         camera_pos[2] -= move_speed
@@ -1267,11 +641,14 @@ def specialKeyListener(key, x, y):
     elif key == GLUT_KEY_RIGHT:
         camera_pos[0] += move_speed
 
-    glutPostRedisplay()
+    request_frame()
 
 def mouseListener(button, state, x, y):
     """Ultra-precision mouse selection with 3-algorithm validation"""
-    global mouse_pressed, selected_cube, selection_x, selection_y
+    global mouse_pressed
+
+    if replayer:
+        return
 
     if state == GLUT_DOWN:
         mouse_pressed = True
@@ -1280,15 +657,14 @@ def mouseListener(button, state, x, y):
         clicked_cube = get_cube_at_position(x, y)
 
         if clicked_cube and not clicked_cube.revealed:
-            selected_cube = clicked_cube
-            selection_x = clicked_cube.grid_x
-            selection_y = clicked_cube.grid_y
             print(f"🎯 PRECISION: cube ({clicked_cube.grid_x}, {clicked_cube.grid_y})")
 
             if button == GLUT_LEFT_BUTTON:
-                reveal_cube(clicked_cube)
+                game.reveal(clicked_cube.grid_x, clicked_cube.grid_y)
             elif button == GLUT_RIGHT_BUTTON:
-                flag_cube(clicked_cube)
+                game.flag(clicked_cube.grid_x, clicked_cube.grid_y)
+            else:
+                game.select(clicked_cube.grid_x, clicked_cube.grid_y)
         else:
             if clicked_cube and clicked_cube.revealed:
                 print(f"○ Clicked revealed cube - selection unchanged")
@@ -1297,7 +673,7 @@ def mouseListener(button, state, x, y):
     else:
         mouse_pressed = False
 
-    glutPostRedisplay()
+    request_frame()
 
 def mouseMotion(x, y):
     """Ultra-precise mouse motion handling"""
@@ -1308,6 +684,7 @@ def mouseMotion(x, y):
 
     # Try to find unrevealed cube under mouse using ULTIMATE precision
     new_hover = get_cube_at_position(x, y)
+    old_hover = hover_cube
 
     # Clear old hover
     if hover_cube:
@@ -1320,7 +697,11 @@ def mouseMotion(x, y):
     else:
         hover_cube = None
 
-    glutPostRedisplay()
+    # Only redraw when the highlight moved
+    if hover_cube != old_hover:
+        request_frame()
+    else:
+        frames.poke()
 
 def setupCamera():
     """Camera setup with optimized perspective"""
@@ -1346,17 +727,52 @@ def setupCamera():
                   camera_target[0], camera_target[1], camera_target[2],
                   0, 1, 0)
 
-def idle():
+def request_frame():
+    """Input arrived: redraw now, and keep the full frame rate for a while"""
+    frames.poke()
     glutPostRedisplay()
 
+def frame_loop(value=0):
+    """Timer-driven main loop: run the game, draw when a frame is due, sleep until the next one"""
+    now = time.perf_counter()
+
+    # Feed due journal events when replaying, then let the engine run its due
+    # timed events (mini-game timeout, next layer, animation ends)
+    if replayer:
+        replayer.advance(time.time())
+    game.step()
+
+    # Game animations keep the full frame rate
+    if game.mini_game_active or game.level_complete or (replayer and not replayer.done):
+        frames.poke(now)
+
+    if frames.next_frame_in(now) == 0.0:
+        frames.frame_started(now)
+        if window_visible:
+            glutPostRedisplay()
+
+    # Sleep until the next frame, or the next game event if that comes first
+    delay = frames.next_frame_in(now)
+    if game.timers.next_time is not None:
+        delay = min(delay, max(game.timers.next_time - game.clock(), 0.0))
+    glutTimerFunc(math.ceil(delay * 1000), frame_loop, 0)
+
+def visibility(state):
+    global window_visible
+    window_visible = state == GLUT_VISIBLE
+
 def showScreen():
+    # Scenery ticks due by now; drawing interpolates between the last two
+    frames.advance(time.perf_counter())
+    text_renderer.load() # First frame only: rasterizes the fonts, before the clear
+
     # Clear screen
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
     glViewport(0, 0, 1200, 800)
 
     # Draw beautiful sky background first
-    draw_sky()
+    sky.call()
 
     # Set up camera
     setupCamera()
@@ -1373,24 +789,26 @@ def showScreen():
     glLightfv(GL_LIGHT0, GL_DIFFUSE, [0.8, 0.8, 0.9, 1])
     glEnable(GL_COLOR_MATERIAL)
 
-    # Draw game elements
-    draw_grid_platform()
+    # Draw game elements (re-baked only when the board size changes)
+    platform.call((GRID_WIDTH, GRID_HEIGHT, CUBE_SPACING))
 
-    # Draw all cubes
-    for z in range(len(grid)):
-        for row in grid[z]:
-            for cube in row:
-                draw_cube(cube)
+    # Draw all cubes (the engine flags the layer once its destruction animation is over)
+    if not game.layer_destroyed:
+        cube_renderer.draw(game.grid, game.selected_cube, game.clock(), frames.time)
 
     # Disable lighting for UI
     glDisable(GL_LIGHTING)
 
-    # Draw UI elements (includes mini-game with unique problems)
+    # Draw UI elements (includes mini-game with unique problems) in window coordinates
+    text_renderer.begin()
     draw_ui()
+    text_renderer.end()
 
     glutSwapBuffers()
 
 def main():
+    global game, replayer
+
     glutInit()
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
     glutInitWindowSize(1200, 800)
@@ -1405,8 +823,17 @@ def main():
     glEnable(GL_POLYGON_SMOOTH)
     glClearColor(0.4, 0.7, 1.0, 1.0) # Sky blue background
 
-    # Initialize game
-    init_grid()
+    # Initialize game (or the replay of a journaled one)
+    if REPLAY_PATH:
+        replayer = Replayer(Journal.load(REPLAY_PATH), start=time.time(), log=print, pregenerate=PREGENERATE)
+        game = replayer.game
+        print(f"📼 Replaying {REPLAY_PATH} ({len(replayer.journal.events)} events)")
+    else:
+        game = Game(GRID_WIDTH, GRID_HEIGHT, MINE_PERCENTAGE, TOTAL_LAYERS, SCANNER_USES,
+                    MINI_GAME_TIME_LIMIT, CUBE_SPACING, seed=MINE_SEED, log=print, no_guess=NO_GUESS,
+                    player=PLAYER_NAME, adaptive=ADAPTIVE_MINI_GAME, pregenerate=PREGENERATE)
+        if JOURNAL_PATH:
+            Journal.attach(game, JOURNAL_PATH)
 
     # Register callbacks
     glutDisplayFunc(showScreen)
@@ -1414,12 +841,14 @@ def main():
     glutSpecialFunc(specialKeyListener)
     glutMouseFunc(mouseListener)
     glutPassiveMotionFunc(mouseMotion)
-    glutIdleFunc(idle)
+    glutVisibilityFunc(visibility)
+    glutTimerFunc(0, frame_loop, 0)
 
     print("=== Clover: Minesweeper - UNIQUE PROBLEMS VERSION ===")
     print("\n🆕 UNIQUE PROBLEMS FEATURES:")
     print("✅ NO math problems ever repeat!")
     print("✅ Tracks all used problems with unique identifiers")
+    print(f"✅ Used problems remembered across sessions for player {PLAYER_NAME!r}")
     print("✅ Displays problem counter on mini-game screen")
     print("✅ Expanded number range (1-25) for maximum variety")
     print("✅ Ensures positive results for subtraction")
@@ -1446,11 +875,16 @@ def main():
     print("Tab - Cycle through unrevealed cubes")
     print("V - Toggle camera view")
     print("R - Reset game")
+    print("Z / Y - Undo / redo")
+    print("F5 - Save game, F9 - Load game")
     print("\n🔢 Problem Generation:")
     print("- Addition: 1-25 + 1-25")
     print("- Subtraction: Larger - Smaller (always positive)")
     print("- Multiplication: 1-25 x 1-25")
-    print("- Total possible unique problems: ~1,875")
+    print("- Division: whole-number results, divisors 2-12")
+    print("- Two-step: a + b x c, a x b - c, ... over 1-12")
+    print("- Difficulty rises with each layer (10 precomputed difficulty levels)")
+    print(f"- Total possible unique problems: {game.problem_deck.size:,}")
     print("\nStarting UNIQUE PROBLEMS version...")
 
     glutMainLoop()
@@ -0,0 +1,311 @@
+"""
+
+Clover: Minesweeper 3D - Board Model
+
+Structure-of-arrays storage for the cube grid. Every per-cube attribute lives
+in a typed NumPy array indexed by (z, y, x); Cube is only a thin view into it.
+
+"""
+
+import numpy as np
+
+def count_adjacent_mines(has_mine, across_layers=False):
+    """Count mines around every cube: 8-neighbourhood per layer, or 26 across layers
+
+    Uses a separable 3x3(x3) box sum over the mine mask instead of looping
+    over cubes; mines themselves get a count of 0.
+    """
+    mines = has_mine.astype(np.uint8)
+
+    # Box sum along x, then y (then z)
+    counts = mines.copy()
+    counts[:, :, 1:] += mines[:, :, :-1]
+    counts[:, :, :-1] += mines[:, :, 1:]
+
+    row_sums = counts.copy()
+    counts[:, 1:, :] += row_sums[:, :-1, :]
+    counts[:, :-1, :] += row_sums[:, 1:, :]
+
+    if across_layers:
+        layer_sums = counts.copy()
+        counts[1:] += layer_sums[:-1]
+        counts[:-1] += layer_sums[1:]
+
+    counts -= mines  # Don't count the cube itself
+    counts[has_mine] = 0
+    return counts
+
+class Board:
+    """All cube state for a board stored as NumPy arrays indexed by (z, y, x)"""
+
+    def __init__(self, width, height, depth=1, spacing=60, epoch=0.0, across_layers=False):
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.spacing = spacing
+        self.shape = (depth, height, width)
+        self.across_layers = across_layers  # 26-neighbourhood adjacency
+
+        # Per-cube state planes
+        self.has_mine = np.zeros(self.shape, dtype=bool)
+        self.revealed = np.zeros(self.shape, dtype=bool)
+        self.flagged = np.zeros(self.shape, dtype=bool)
+        self.adjacent_mines = np.zeros(self.shape, dtype=np.uint8)
+
+        # Destruction start times are stored as float32 offsets from epoch
+        # (0 means "not destroyed") so the plane stays 4 bytes per cube
+        self.epoch = epoch
+        self.destruction_offset = np.zeros(self.shape, dtype=np.float32)
+
+        # World coordinates are broadcast views: one float per axis, not per cube
+        self.world_x = np.broadcast_to(
+            (np.arange(width, dtype=np.float32) * spacing)[None, None, :], self.shape)
+        self.world_y = np.broadcast_to(
+            (-np.arange(depth, dtype=np.float32) * spacing * 3)[:, None, None], self.shape)  # Layers stacked vertically
+        self.world_z = np.broadcast_to(
+            (np.arange(height, dtype=np.float32) * spacing)[None, :, None], self.shape)
+
+        # Board-wide view state
+        self.mines_revealed = False  # Hack mode
+        self.hover_cell = None       # (z, y, x) of the hovered cube
+
+    @property
+    def size(self):
+        return self.width * self.height * self.depth
+
+    @property
+    def nbytes(self):
+        """Memory used by the per-cube planes"""
+        return (self.has_mine.nbytes + self.revealed.nbytes + self.flagged.nbytes +
+                self.adjacent_mines.nbytes + self.destruction_offset.nbytes)
+
+    def in_bounds(self, x, y, z=0):
+        return 0 <= x < self.width and 0 <= y < self.height and 0 <= z < self.depth
+
+    def cube(self, x, y, z=0):
+        """Get a Cube view for grid coordinates (no bounds check)"""
+        return Cube(self, x, y, z)
+
+    def cubes(self):
+        """Iterate over every cube in (z, y, x) order"""
+        for z in range(self.depth):
+            for y in range(self.height):
+                for x in range(self.width):
+                    yield Cube(self, x, y, z)
+
+    def destruction_time(self, x, y, z=0):
+        offset = float(self.destruction_offset[z, y, x])
+        return self.epoch + offset if offset > 0 else 0
+
+    def set_destruction_time(self, x, y, z, value):
+        self.destruction_offset[z, y, x] = max(value - self.epoch, 1e-6) if value else 0
+
+    def start_destruction(self, now, z=None):
+        """Start the destruction animation for a whole layer (or the whole board)"""
+        offset = max(now - self.epoch, 1e-6)
+        if z is None:
+            self.destruction_offset[...] = offset
+        else:
+            self.destruction_offset[z] = offset
+
+    def place_mines(self, count, rng=None, z=None, exclude=None):
+        """Place exactly `count` mines on distinct random cubes of a layer (or the whole board)
+
+        Samples cube indices without replacement from a seedable NumPy
+        Generator, so the cost is the same at any mine density. `exclude`
+        lists flat indices (within the layer) that must stay mine-free.
+        """
+        if rng is None or isinstance(rng, (int, np.integer)):
+            rng = np.random.default_rng(rng)
+
+        plane = self.has_mine if z is None else self.has_mine[z]
+        candidates = None
+        size = plane.size
+        if exclude is not None:
+            allowed = np.ones(plane.size, dtype=bool)
+            allowed[exclude] = False
+            candidates = np.flatnonzero(allowed)
+            size = len(candidates)
+
+        if not 0 <= count <= size:
+            raise ValueError(f"Cannot place {count} mines on {size} cubes")
+
+        if count <= size // 2:
+            picked = rng.choice(size, size=count, replace=False, shuffle=False)
+        else:
+            # Dense boards: sample the (fewer) safe cubes instead
+            safe = rng.choice(size, size=size - count, replace=False, shuffle=False)
+            chosen = np.ones(size, dtype=bool)
+            chosen[safe] = False
+            picked = np.flatnonzero(chosen)
+
+        cells = picked if candidates is None else candidates[picked]
+        flat = plane.reshape(-1)
+        flat[:] = False
+        flat[cells] = True
+        return cells
+
+    def calculate_adjacent_mines(self):
+        """Recompute adjacency counts for the whole board"""
+        self.adjacent_mines[...] = count_adjacent_mines(self.has_mine, self.across_layers)
+
+    def neighbourhood(self, x, y, z=0):
+        """Slices of the 3x3 (3x3x3 across layers) window around a cube, clipped to the board"""
+        if self.across_layers:
+            z_slice = slice(max(z - 1, 0), z + 2)
+        else:
+            z_slice = slice(z, z + 1)
+        return (z_slice, slice(max(y - 1, 0), y + 2), slice(max(x - 1, 0), x + 2))
+
+    def set_mine(self, x, y, z, value):
+        """Add or remove one mine, updating adjacency only inside its window"""
+        value = bool(value)
+        if self.has_mine[z, y, x] == value:
+            return
+
+        self.has_mine[z, y, x] = value
+        window = self.neighbourhood(x, y, z)
+        counts = self.adjacent_mines[window]
+        mines = self.has_mine[window]
+
+        # Neighbouring safe cubes gain or lose one adjacent mine
+        neighbours = ~mines
+        neighbours[z - window[0].start, y - window[1].start, x - window[2].start] = False
+        if value:
+            counts[neighbours] += 1
+            self.adjacent_mines[z, y, x] = 0
+        else:
+            counts[neighbours] -= 1
+            self.adjacent_mines[z, y, x] = np.count_nonzero(mines)
+
+    def neighbour_offsets(self):
+        """(dz, dy, dx) offsets of the neighbourhood, excluding the cube itself"""
+        dz_range = (-1, 0, 1) if self.across_layers else (0,)
+        offsets = [(dz, dy, dx) for dz in dz_range for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                   if (dz, dy, dx) != (0, 0, 0)]
+        return np.array(offsets, dtype=np.intp).T
+
+    def flood_reveal(self, x, y, z=0):
+        """Reveal a safe cube and, if it has no adjacent mines, its whole zero region
+
+        Breadth-first search that expands the entire frontier at once with array
+        operations, so there is no recursion limit and no per-cube Python call.
+        Flagged cubes and mines are never revealed. Returns the flat indices of
+        every cube that changed, in reveal order.
+        """
+        if self.revealed[z, y, x] or self.flagged[z, y, x] or self.has_mine[z, y, x]:
+            return np.empty(0, dtype=np.intp)
+
+        revealed = self.revealed.reshape(-1)
+        blocked = self.flagged.reshape(-1) | self.has_mine.reshape(-1)
+        adjacent = self.adjacent_mines.reshape(-1)
+        dz, dy, dx = self.neighbour_offsets()
+
+        start = np.ravel_multi_index((z, y, x), self.shape)
+        revealed[start] = True
+        changed = [np.array([start], dtype=np.intp)]
+        frontier = changed[0] if adjacent[start] == 0 else changed[0][:0]
+
+        while frontier.size:
+            fz, fy, fx = np.unravel_index(frontier, self.shape)
+            nz = (fz[:, None] + dz).ravel()
+            ny = (fy[:, None] + dy).ravel()
+            nx = (fx[:, None] + dx).ravel()
+            inside = ((nz >= 0) & (nz < self.depth) & (ny >= 0) & (ny < self.height) &
+                      (nx >= 0) & (nx < self.width))
+
+            cells = np.unique(np.ravel_multi_index((nz[inside], ny[inside], nx[inside]), self.shape))
+            cells = cells[~(revealed[cells] | blocked[cells])]
+            revealed[cells] = True
+            changed.append(cells)
+
+            # Only cubes with no adjacent mines keep spreading
+            frontier = cells[adjacent[cells] == 0]
+
+        return np.concatenate(changed)
+
+    def cell_coords(self, flat_indices):
+        """Convert flat indices to (x, y, z) tuples"""
+        z, y, x = np.unravel_index(flat_indices, self.shape)
+        return list(zip(x.tolist(), y.tolist(), z.tolist()))
+
+    def move_mine(self, from_cell, to_cell):
+        """Move a mine from one (x, y, z) cell to another"""
+        self.set_mine(*from_cell, False)
+        self.set_mine(*to_cell, True)
+
+    def mine_count(self):
+        return int(np.count_nonzero(self.has_mine))
+
+    def unrevealed_count(self, z=None):
+        plane = self.revealed if z is None else self.revealed[z]
+        return int(plane.size - np.count_nonzero(plane))
+
+    def unrevealed_cells(self, z=0):
+        """Flat (y * width + x) indices of unrevealed cubes in a layer, row-major"""
+        return np.flatnonzero(~self.revealed[z])
+
+def _cell_property(name, cast):
+    """Expose one board plane as an attribute of a Cube view"""
+    def getter(self):
+        return cast(getattr(self.board, name)[self.grid_z, self.grid_y, self.grid_x])
+
+    def setter(self, value):
+        getattr(self.board, name)[self.grid_z, self.grid_y, self.grid_x] = value
+
+    return property(getter, setter)
+
+class Cube:
+    """Thin view of a single cube inside a Board"""
+
+    __slots__ = ("board", "grid_x", "grid_y", "grid_z")
+
+    def __init__(self, board, x, y, z=0):
+        self.board = board
+        self.grid_x = x
+        self.grid_y = y
+        self.grid_z = z
+
+    has_mine = _cell_property("has_mine", bool)
+    revealed = _cell_property("revealed", bool)
+    flagged = _cell_property("flagged", bool)
+    adjacent_mines = _cell_property("adjacent_mines", int)
+    world_x = _cell_property("world_x", float)
+    world_y = _cell_property("world_y", float)
+    world_z = _cell_property("world_z", float)
+
+    @property
+    def destruction_time(self):
+        return self.board.destruction_time(self.grid_x, self.grid_y, self.grid_z)
+
+    @destruction_time.setter
+    def destruction_time(self, value):
+        self.board.set_destruction_time(self.grid_x, self.grid_y, self.grid_z, value)
+
+    @property
+    def mine_revealed(self):
+        """Hack mode - mine is shown"""
+        return self.board.mines_revealed and self.has_mine
+
+    @property
+    def hover(self):
+        return self.board.hover_cell == (self.grid_z, self.grid_y, self.grid_x)
+
+    @hover.setter
+    def hover(self, value):
+        cell = (self.grid_z, self.grid_y, self.grid_x)
+        if value:
+            self.board.hover_cell = cell
+        elif self.board.hover_cell == cell:
+            self.board.hover_cell = None
+
+    def __eq__(self, other):
+        return (isinstance(other, Cube) and other.board is self.board and
+                other.grid_x == self.grid_x and other.grid_y == self.grid_y and
+                other.grid_z == self.grid_z)
+
+    def __hash__(self):
+        return hash((id(self.board), self.grid_x, self.grid_y, self.grid_z))
+
+    def __repr__(self):
+        return f"Cube({self.grid_x}, {self.grid_y}, {self.grid_z})"
@@ -0,0 +1,713 @@
+"""
+
+Clover: Minesweeper 3D - Game Engine
+
+Headless game rules and state. Nothing in here touches OpenGL/GLUT, so games
+can be played (or simulated) without a window; the GLUT frontend is just one
+client that forwards input to a Game and draws its state.
+
+"""
+
+import functools
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from clover_board import Board
+from clover_history import History
+from clover_index import UnrevealedIndex
+from clover_problems import ProblemDeck, store_path, tier_for_layer
+from clover_scheduler import Scheduler
+from clover_solver import generate_no_guess
+from clover_telemetry import ResponseLog, adaptive_time_limit, tier_offset
+
+LEVEL_TRANSITION_DELAY = 3.0 # Seconds of congrats animation before the next layer
+DESTRUCTION_DURATION = 1.0 # Seconds a completed layer takes to crumble away
+MINI_GAME_GRACE = 1.0 # "TIME'S UP!" is shown this long before the mine detonates
+MAX_ANSWER_LENGTH = 5 # Characters the mini-game answer box accepts
+
+def _quiet(message):
+    pass
+
+def _generate_layer(width, height, mines, rng, no_guess, budget):
+    """Mine one layer; runs in the game thread or a pre-generation worker
+
+    Returns the has_mine and adjacency planes, the no-guess stats and the
+    generator (a worker process advances a copy, which the game adopts).
+    """
+    board = Board(width, height, 1)
+    stats = None
+    if no_guess:
+        # Mines placed so the layer can be cleared from the center without guessing
+        start = (width // 2, height // 2)
+        stats = generate_no_guess(board, mines, start, rng, time_budget=budget)
+    else:
+        # Place mines randomly (sampled without replacement)
+        board.place_mines(mines, rng, z=0)
+        board.calculate_adjacent_mines()
+    return board.has_mine, board.adjacent_mines, stats, rng
+
+_process_pool = None
+
+def _pregeneration_pool():
+    """Worker process shared by every game that pre-generates in a process"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=1)
+    return _process_pool
+
+def journaled(method):
+    """Record calls of a player input method in game.journal (see clover_journal)
+
+    Only calls from outside the engine are recorded: replaying them repeats
+    whatever they called internally. Timed events due before the input run
+    first, as they do when it is replayed.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._journaling:
+            return method(self, *args, **kwargs)
+        now = self.clock()
+        self.step(now)
+        if self.journal is not None:
+            self.journal.record(now, name, args, kwargs)
+        self._journaling = True
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._journaling = False
+
+    return wrapper
+
+class Game:
+    """All Clover game state plus the rules that change it"""
+
+    def __init__(self, width=10, height=10, mine_percentage=0.15, total_layers=5,
+                 scanner_uses=3, mini_game_time_limit=5, cube_spacing=60,
+                 seed=None, clock=time.time, log=None, no_guess=False, no_guess_budget=None,
+                 player=None, problem_dir=None, adaptive=False, undo_limit=100, pregenerate=None,
+                 board=None):
+        # Configuration
+        self.width = width
+        self.height = height
+        self.mine_percentage = mine_percentage
+        self.total_layers = total_layers
+        self.max_scanner_uses = scanner_uses
+        self.base_time_limit = mini_game_time_limit
+        self.mini_game_time_limit = mini_game_time_limit # Adapted per problem when `adaptive`
+        self.adaptive = adaptive # Tune time limit and difficulty from recent response times
+        self.cube_spacing = cube_spacing
+        if seed is None:
+            seed = np.random.SeedSequence().entropy # Always known, so any game can be replayed
+        self.seed = seed
+        self.no_guess = no_guess # Only deal boards the solver can clear from the center cube
+        self.no_guess_budget = no_guess_budget # Seconds allowed for no-guess generation
+        self.generation_stats = None
+
+        # Boards are mined one layer ahead in the background ("thread" or "process"; None: on demand).
+        # Each board is still the next one the mine generator deals, so games don't depend on it.
+        if pregenerate not in (None, "thread", "process"):
+            raise ValueError(f"pregenerate must be None, 'thread' or 'process', not {pregenerate!r}")
+        self.pregenerate = pregenerate
+        self._executor = None
+        self._pending = None # Future of the next board
+        self._pending_state = None # Mine generator state before it
+
+        # Time source and message sink (print for the GLUT frontend)
+        self.clock = clock
+        self.log = log or _quiet
+        self.journal = None # Input recorder (see clover_journal.Journal)
+        self._journaling = False
+
+        # Mini-game timeout, layer transition and animation ends (see step)
+        self.timers = Scheduler()
+        self._timeout = None
+
+        # Undo/redo of the current layer's actions (0 disables it)
+        self.undo_limit = undo_limit
+        self.history = History(undo_limit)
+        self.verbose = log is not None # Skip building log strings nobody reads
+
+        # Separate generators for mines and problems, both seeded
+        self.mine_rng = np.random.default_rng(seed)
+
+        # UNIQUE PROBLEMS TRACKING - a shuffled deck of every problem, survives reset()
+        # (and, for a named player, restarts: used problems are kept in a file)
+        self.player = player
+        path = store_path(player, problem_dir) if player else None
+        self.problem_deck = ProblemDeck(seed, path=path)
+
+        # Mini-game response times and correctness - survive reset()
+        self.responses = ResponseLog()
+
+        self.reset(announce=False, board=board)
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    @journaled
+    def reset(self, announce=True, board=None):
+        """Start a new game from the first layer (on `board` if given, else a new one)"""
+        self.current_layer = 0
+        self.score = 0
+        self.game_over = False
+        self.won = False
+        self.level_complete = False
+        self.scanner_uses = self.max_scanner_uses
+        self.selected_cube = None
+        self.congrats_animation_start = 0
+        self.next_layer_at = 0
+        self.timers.clear()
+
+        # Mini-game state
+        self.mini_game_active = False
+        self.mini_game_cube = None # The mine being defused
+        self.mini_game_problem_index = None
+        self.mini_game_answer = 0
+        self.mini_game_input = ""
+        self.mini_game_start_time = 0
+
+        self.init_grid(board)
+        self.problem_deck.flush()
+
+        if announce:
+            self.log("🔄 Game reset!")
+            if self.problems_used > 0:
+                self.log(f"📊 Unique problems tracking continues: {self.problems_used} used")
+            else:
+                self.log("📊 Unique problems tracking reset to 0")
+
+    def init_grid(self, board=None):
+        """Build a fresh board for the current layer (or adopt an already generated `board`)"""
+        self.mines_count = int(self.width * self.height * self.mine_percentage)
+        self.flags_count = 0
+        self.safe_cubes_revealed = 0
+        self.mines_revealed = False
+        self.layer_destroyed = False # Destruction animation over: nothing left to draw
+
+        # Create grid for current layer (one layer at a time, stored as arrays),
+        # with an ordered index of unrevealed cubes for selection movement
+        if board is None:
+            self.grid, self.unrevealed = self._next_board()
+        else:
+            self.grid = board
+            self.unrevealed = UnrevealedIndex(board.revealed[0])
+
+        # Calculate total safe cubes
+        self.total_safe_cubes = self.width * self.height - self.mines_count
+
+        # Actions can only be undone on the layer they happened on
+        self.history.clear()
+
+        # Reset selection to center
+        self.selected_cube = self.cube_at(self.width // 2, self.height // 2)
+
+        # Mine the next layer while this one is played
+        self._pregenerate_next()
+
+    # ------------------------------------------------------------------
+    # Board generation
+    # ------------------------------------------------------------------
+
+    def _next_board(self):
+        """The next board the mine generator deals (pre-generated if one is pending) and its index"""
+        if self._pending is not None:
+            layer = self._pending.result()
+            self._pending = self._pending_state = None
+            if self.pregenerate == "process":
+                layer = self._build_layer(*layer)
+        else:
+            layer = self._build_layer(*_generate_layer(self.width, self.height, self.mines_count, self.mine_rng,
+                                                       self.no_guess, self.no_guess_budget))
+
+        board, unrevealed, stats, self.mine_rng = layer
+        board.epoch = self.clock() # Nothing is destroyed yet, so the epoch can move
+        if stats is not None:
+            self.generation_stats = stats
+            self.log(f"🧩 No-guess board: {stats['attempts']} attempt(s), {stats['seconds'] * 1000:.1f} ms")
+        return board, unrevealed
+
+    def _build_layer(self, has_mine, adjacent, stats, rng):
+        """Board and unrevealed index around generated planes (in the worker thread when pre-generating)"""
+        board = Board(self.width, self.height, 1, self.cube_spacing)
+        board.has_mine = has_mine
+        board.adjacent_mines = adjacent
+        return board, UnrevealedIndex(board.revealed[0]), stats, rng
+
+    def _pregenerate_layer(self, *args):
+        return self._build_layer(*_generate_layer(*args))
+
+    def _pregenerate_next(self):
+        if not self.pregenerate or self._pending is not None or self.current_layer + 1 >= self.total_layers:
+            return
+        args = (self.width, self.height, self.mines_count, self.mine_rng, self.no_guess, self.no_guess_budget)
+        self._pending_state = self.mine_rng.bit_generator.state
+        if self.pregenerate == "process":
+            # Only the planes cross the process boundary; the board is built on adoption
+            self._pending = _pregeneration_pool().submit(_generate_layer, *args)
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clover-pregenerate")
+            self._pending = self._executor.submit(self._pregenerate_layer, *args)
+
+    @property
+    def mine_rng_state(self):
+        """Mine generator state as of the current layer (before any pre-generated board)"""
+        if self._pending is not None:
+            return self._pending_state
+        return self.mine_rng.bit_generator.state
+
+    def restore_mine_rng(self, state):
+        """Continue dealing boards from a saved mine generator state"""
+        if self._pending is not None:
+            self._pending.result() # A worker thread may still be drawing from the generator
+            self._pending = self._pending_state = None
+        self.mine_rng.bit_generator.state = state
+        self._pregenerate_next()
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def cube_at(self, grid_x, grid_y):
+        """Get cube at specific grid coordinates"""
+        if 0 <= grid_x < self.width and 0 <= grid_y < self.height:
+            return self.grid.cube(grid_x, grid_y)
+        return None
+
+    @property
+    def selection_x(self):
+        return self.selected_cube.grid_x if self.selected_cube else 0
+
+    @property
+    def selection_y(self):
+        return self.selected_cube.grid_y if self.selected_cube else 0
+
+    @journaled
+    def select(self, x, y):
+        self.selected_cube = self.cube_at(x, y)
+        return self.selected_cube
+
+    def find_next_unrevealed_cube(self, start_x, start_y, dx, dy):
+        """Find the next unrevealed cube in a given direction (wrapping around)"""
+        x, y = start_x, start_y
+        if dy == 0 and dx:
+            x = self.unrevealed.next_in_row(start_x, start_y, dx)
+        elif dx == 0 and dy:
+            y = self.unrevealed.next_in_column(start_x, start_y, dy)
+        else:
+            # Diagonal moves: step cube by cube
+            for _ in range(max(self.width, self.height)): # Maximum possible moves
+                x = (x + dx) % self.width
+                y = (y + dy) % self.height
+                if (x, y) in self.unrevealed:
+                    return x, y, self.cube_at(x, y)
+            x = None
+
+        if x is None or y is None:
+            # If the whole row/column is revealed, return current position
+            return start_x, start_y, self.cube_at(start_x, start_y)
+        return x, y, self.cube_at(x, y)
+
+    @journaled
+    def move_selection(self, dx, dy):
+        """Smart movement that skips revealed cubes"""
+        new_x, new_y, self.selected_cube = self.find_next_unrevealed_cube(
+            self.selection_x, self.selection_y, dx, dy)
+
+        if self.selected_cube:
+            self.log(f"→ Moved to cube ({new_x}, {new_y})")
+
+    @journaled
+    def cycle_selection(self):
+        """Cycle through unrevealed cubes only"""
+        # Next unrevealed cube after the current selection (or the first one)
+        if self.selected_cube and not self.selected_cube.revealed:
+            found = self.unrevealed.next_after(self.selection_x, self.selection_y)
+        else:
+            found = self.unrevealed.first()
+
+        if found is None:
+            return
+
+        x, y = found
+        self.select(x, y)
+        self.log(f"→ Cycled to unrevealed cube ({x}, {y})")
+
+    def has_unrevealed(self):
+        return len(self.unrevealed) > 0
+
+    def nearest_unrevealed(self, x, y):
+        """Unrevealed cube closest to grid position (x, y), or None"""
+        found = self.unrevealed.nearest(x, y)
+        return self.cube_at(*found) if found else None
+
+    def _revealed_changed(self, cells):
+        """Keep the cube indexes in sync after cubes were revealed (flat y * width + x indices)"""
+        self.unrevealed.refresh(cells)
+
+    # ------------------------------------------------------------------
+    # Player actions
+    # ------------------------------------------------------------------
+
+    def _target(self, x, y):
+        """Cube at (x, y), or the selected cube when no position is given"""
+        if x is None or y is None:
+            return self.selected_cube
+        return self.select(x, y)
+
+    @journaled
+    def reveal(self, x=None, y=None):
+        """Reveal the cube at (x, y) (or the selected cube); returns changed cells"""
+        cube = self._target(x, y)
+        return self.reveal_cube(cube) if cube else []
+
+    def _flat(self, x, y, z=0):
+        return (z * self.height + y) * self.width + x
+
+    def reveal_cube(self, cube):
+        if cube.flagged or cube.revealed or self.game_over or self.mini_game_active:
+            return []
+
+        self.history.begin(self)
+        if cube.has_mine:
+            # The undo step stays open until the mini-game is decided
+            cube.revealed = True
+            self.history.cells("revealed", [self._flat(cube.grid_x, cube.grid_y, cube.grid_z)], False, True)
+            self._revealed_changed([cube.grid_y * self.width + cube.grid_x])
+            self.log(f"✓ Revealed cube at ({cube.grid_x}, {cube.grid_y})")
+
+            # Trigger mini-game with unique problems
+            self.selected_cube = cube
+            self.mini_game_cube = cube
+            self.start_mini_game()
+            return [(cube.grid_x, cube.grid_y, cube.grid_z)]
+
+        # Reveal this cube plus (if it has 0 adjacent mines) its whole safe region in one batch
+        changed = self.grid.flood_reveal(cube.grid_x, cube.grid_y, cube.grid_z)
+        self.history.cells("revealed", changed, False, True)
+        self._revealed_changed(changed % (self.width * self.height))
+        self.log(f"✓ Revealed {len(changed)} cube(s) from ({cube.grid_x}, {cube.grid_y})")
+
+        self.safe_cubes_revealed += len(changed)
+        self.score += 10 * len(changed)
+
+        # Check for level completion
+        if self.safe_cubes_revealed >= self.total_safe_cubes:
+            self.complete_level()
+
+        self.history.commit(self)
+        return self.grid.cell_coords(changed)
+
+    @journaled
+    def flag(self, x=None, y=None):
+        cube = self._target(x, y)
+        if cube:
+            self.flag_cube(cube)
+
+    def flag_cube(self, cube):
+        if cube.revealed or self.game_over or self.mini_game_active:
+            return
+
+        self.history.begin(self)
+        cube.flagged = not cube.flagged
+        self.history.cells("flagged", [self._flat(cube.grid_x, cube.grid_y, cube.grid_z)],
+                           not cube.flagged, cube.flagged)
+        if cube.flagged:
+            self.flags_count += 1
+            self.log(f"🚩 Flagged cube at ({cube.grid_x}, {cube.grid_y})")
+        else:
+            self.flags_count -= 1
+            self.log(f"🚩 Unflagged cube at ({cube.grid_x}, {cube.grid_y})")
+        self.history.commit(self)
+
+    @journaled
+    def scan(self, x=None, y=None):
+        """Use scanner to reveal 3x3 area around the selected cube; returns changed cells"""
+        center = self._target(x, y)
+
+        if self.scanner_uses <= 0 or not center or self.game_over or self.mini_game_active:
+            return []
+
+        self.history.begin(self)
+        self.scanner_uses -= 1
+        self.log(f"📡 Scanner used at ({center.grid_x}, {center.grid_y}) - 3x3 area")
+
+        # Reveal every safe, hidden cube of the 3x3 area
+        z = center.grid_z
+        _, y_slice, x_slice = self.grid.neighbourhood(center.grid_x, center.grid_y, z)
+        hidden_safe = ~(self.grid.has_mine[z, y_slice, x_slice] | self.grid.revealed[z, y_slice, x_slice])
+        self.grid.revealed[z, y_slice, x_slice] |= hidden_safe
+
+        ys, xs = np.nonzero(hidden_safe)
+        changed = [(int(x) + x_slice.start, int(y) + y_slice.start, z) for y, x in zip(ys, xs)]
+        self.history.cells("revealed", [self._flat(x, y, z) for x, y, z in changed], False, True)
+        self._revealed_changed([y * self.width + x for x, y, _ in changed])
+        self.safe_cubes_revealed += len(changed)
+        self.history.commit(self)
+
+        self.log(f"📡 Scanner revealed {len(changed)} safe cubes")
+        return changed
+
+    @journaled
+    def toggle_hack_mode(self):
+        """Toggle hack mode to reveal/hide all mines"""
+        self.mines_revealed = not self.mines_revealed
+
+        # Update mine visibility (cubes read this board-wide flag)
+        self.grid.mines_revealed = self.mines_revealed
+
+        if self.mines_revealed:
+            self.log("🔍 HACK MODE: All mines revealed!")
+        else:
+            self.log("🔍 HACK MODE: Disabled")
+
+    # ------------------------------------------------------------------
+    # Mini-game
+    # ------------------------------------------------------------------
+
+    @property
+    def problems_used(self):
+        """Unique problems dealt since the deck was last exhausted"""
+        return self.problem_deck.dealt
+
+    @property
+    def mini_game_problem(self):
+        """Display text of the current problem (built on demand)"""
+        if self.mini_game_problem_index is None:
+            return ""
+        return self.problem_deck.text(self.mini_game_problem_index)
+
+    @property
+    def problem_tier(self):
+        """Difficulty levels (low, high) of the problems asked on the current layer"""
+        offset = tier_offset(self.responses, self.mini_game_time_limit) if self.adaptive else 0
+        return tier_for_layer(self.current_layer, offset)
+
+    def generate_unique_problem(self):
+        """Deal a problem of the current layer's tier that hasn't been used before; returns (index, answer)"""
+        deck = self.problem_deck
+        cycles = deck.cycles
+        index = deck.deal(*self.problem_tier)
+        if deck.cycles != cycles:
+            self.log("🔄 All problems of this tier exhausted! Reshuffling them...")
+
+        if self.verbose:
+            self.log(f"🆕 Generated NEW unique problem: {deck.text(index)} "
+                     f"(ID: {deck.problem_id(index)}, difficulty {deck.level(index)})")
+            self.log(f"📊 Total unique problems used: {self.problems_used}")
+        return index, deck.answer(index)
+
+    def start_mini_game(self):
+        self.mini_game_active = True
+        self.mini_game_input = ""
+        self.mini_game_start_time = self.clock()
+        if self.adaptive:
+            self.mini_game_time_limit = adaptive_time_limit(self.responses, self.base_time_limit)
+        self._schedule_timeout()
+
+        # Deal the next UNIQUE math problem
+        self.mini_game_problem_index, self.mini_game_answer = self.generate_unique_problem()
+
+        if self.verbose:
+            self.log(f"💎 UNIQUE MINI-GAME: {self.mini_game_problem}")
+            self.log(f"📊 This is unique problem #{self.problems_used}")
+
+    @journaled
+    def answer(self, text=None):
+        """Submit a mini-game answer (defaults to the typed mini_game_input)"""
+        if not self.mini_game_active:
+            return False
+
+        if text is None:
+            text = self.mini_game_input
+        try:
+            correct = int(text) == self.mini_game_answer
+        except (TypeError, ValueError):
+            self.record_response(False)
+            self.log("❌ UNIQUE: Invalid input! Mine detonated!")
+            self.handle_mini_game_result(False)
+            return False
+
+        self.record_response(correct)
+
+        if correct:
+            self.log("✅ UNIQUE: Correct answer! Mine defused!")
+        else:
+            self.log("❌ UNIQUE: Wrong answer! Mine detonated!")
+        self.handle_mini_game_result(correct)
+        return correct
+
+    @journaled
+    def type_answer(self, char):
+        """Append a typed character to the mini-game answer"""
+        if self.mini_game_active and len(self.mini_game_input) < MAX_ANSWER_LENGTH:
+            self.mini_game_input += char
+
+    @journaled
+    def erase_answer(self):
+        """Backspace in the mini-game answer"""
+        self.mini_game_input = self.mini_game_input[:-1]
+
+    def record_response(self, correct, now=None, timed_out=False):
+        """Log how long the current problem took to answer (see clover_telemetry)"""
+        if now is None:
+            now = self.clock()
+        index = self.mini_game_problem_index
+        deck = self.problem_deck
+        self.responses.record(now - self.mini_game_start_time, correct,
+                              deck.op[index], deck.level(index), timed_out)
+
+    def response_summary(self):
+        """One-line latency summary of the recorded answers"""
+        stats = self.responses.summary()
+        if not stats["answers"]:
+            return "no problems answered"
+        latency = stats["latency"]
+        return (f"{stats['answers']} answered, {stats['accuracy']:.0%} correct, "
+                f"p50 {latency[50]:.1f}s / p90 {latency[90]:.1f}s / p99 {latency[99]:.1f}s")
+
+    def mini_game_time_left(self, now=None):
+        if now is None:
+            now = self.clock()
+        return self.mini_game_time_limit - (now - self.mini_game_start_time)
+
+    def _schedule_timeout(self):
+        deadline = self.mini_game_start_time + self.mini_game_time_limit + MINI_GAME_GRACE
+        self._timeout = self.timers.schedule(deadline, "mini-game timeout", self._mini_game_timed_out)
+
+    def _mini_game_timed_out(self, deadline):
+        # Timeouts count as the full time (not the moment they were noticed) so replays agree
+        self.record_response(False, deadline, timed_out=True)
+        self.handle_mini_game_result(False)
+
+    def handle_mini_game_result(self, success):
+        self.mini_game_active = False
+        if self._timeout is not None:
+            self._timeout.cancel()
+            self._timeout = None
+
+        if success:
+            # Successfully defused
+            self.score += 50
+            cube = self.mini_game_cube
+            if cube:
+                # Remove the mine and update only the neighbouring counts
+                self.grid.set_mine(cube.grid_x, cube.grid_y, cube.grid_z, False)
+                self.history.mine(cube.grid_x, cube.grid_y, cube.grid_z, True)
+                cube.revealed = True
+                self.safe_cubes_revealed += 1
+            self.log("💎 UNIQUE: Mine successfully defused!")
+            self.mini_game_cube = None
+        else:
+            # Failed to defuse
+            self.game_over = True
+            self.log("💎 UNIQUE: Mine detonated! Game Over!")
+            if self.verbose:
+                self.log(f"⏱️ Response times: {self.response_summary()}")
+        self.history.commit(self)
+
+    # ------------------------------------------------------------------
+    # Undo
+    # ------------------------------------------------------------------
+
+    def can_undo(self):
+        # Not mid-mini-game, and not once the layer is done (the next one is on its way)
+        return not (self.mini_game_active or self.level_complete) and self.history.can_undo()
+
+    def can_redo(self):
+        return not (self.mini_game_active or self.level_complete) and self.history.can_redo()
+
+    @journaled
+    def undo(self):
+        """Revert the last reveal/flag/scan/mini-game on this layer"""
+        if not self.can_undo():
+            return False
+        changed = self.history.undo(self)
+        self._revealed_changed(changed % (self.width * self.height))
+        self.log(f"↩️ Undo ({len(self.history.undo_stack)} more available)")
+        return True
+
+    @journaled
+    def redo(self):
+        if not self.can_redo():
+            return False
+        changed = self.history.redo(self)
+        self._revealed_changed(changed % (self.width * self.height))
+        self.log(f"↪️ Redo ({len(self.history.redo_stack)} more available)")
+        return True
+
+    # ------------------------------------------------------------------
+    # Layers and time
+    # ------------------------------------------------------------------
+
+    def complete_level(self):
+        if self.level_complete:
+            return
+
+        now = self.clock()
+        self.level_complete = True
+        self.score += 100
+        self.congrats_animation_start = now
+        self.log(f"🎉 LEVEL {self.current_layer + 1} COMPLETE! Score bonus: +100")
+        self.log(f"📊 Total unique problems used this session: {self.problems_used}")
+
+        # Trigger destruction animation
+        self.grid.start_destruction(now, 0)
+        self.timers.schedule(now + DESTRUCTION_DURATION, "layer destroyed", self._layer_destroyed)
+
+        # Move to next layer after animation
+        self.next_layer_at = now + LEVEL_TRANSITION_DELAY
+        self.timers.schedule(self.next_layer_at, "next layer", self._next_layer_due)
+
+    def _layer_destroyed(self, at):
+        self.layer_destroyed = True
+
+    def _next_layer_due(self, at):
+        self.next_layer()
+
+    def next_layer(self):
+        self.current_layer += 1
+        self.congrats_animation_start = 0
+        self.next_layer_at = 0
+
+        if self.current_layer < self.total_layers:
+            self.init_grid()
+            self.level_complete = False
+            self.log(f"🔽 Descending to layer {self.current_layer + 1}...")
+        else:
+            # Game won!
+            self.game_over = True
+            self.won = True
+            self.score += 500
+            self.log("🏆 ALL LAYERS COMPLETE! You won the game!")
+            self.log(f"🎯 Final unique problems used: {self.problems_used}")
+            if self.verbose:
+                self.log(f"⏱️ Response times: {self.response_summary()}")
+
+    def step(self, now=None):
+        """Run the timed events (mini-game timeout, layer transition, animation ends) due by `now`"""
+        if now is None:
+            now = self.clock()
+        if not self.timers.due(now):
+            return
+        if self.journal is not None:
+            self.journal.record(now, "step", ()) # Replays must see events that fire after the last input
+        self.timers.advance(now)
+
+    def schedule_timers(self):
+        """Rebuild the timed events from the game state (after restoring it, see clover_save)"""
+        self.timers.clear()
+        self._timeout = None
+        if self.mini_game_active:
+            self._schedule_timeout()
+        board = self.grid
+        if board.destruction_offset[0].any():
+            end = board.epoch + float(board.destruction_offset[0].max()) + DESTRUCTION_DURATION
+            self.timers.schedule(end, "layer destroyed", self._layer_destroyed)
+        if self.next_layer_at:
+            self.timers.schedule(self.next_layer_at, "next layer", self._next_layer_due)
@@ -0,0 +1,104 @@
+"""
+
+Clover: Minesweeper 3D - Frame Pacing
+
+Scenery animation (drifting clouds, swaying grass, pulsing highlights) runs
+on a fixed simulation tick, so it moves at the same speed at any frame rate.
+Frames are drawn at most FRAME_CAP times a second and interpolate between
+the last two ticks; once nothing has happened for a while they drop to a low
+idle rate, so an untouched window costs almost no CPU.
+
+"""
+
+import time
+
+SIM_TICK = 1 / 60 # Seconds of scenery time per simulation tick
+MAX_TICKS_PER_FRAME = 8 # A slow frame drops the excess instead of catching up forever
+FRAME_CAP = 60 # Frames per second while active (None: draw as often as the swap allows)
+IDLE_FPS = 10 # Frames per second once idle
+IDLE_AFTER = 5.0 # Seconds without input or game animation before going idle
+
+class FramePacer:
+    """Fixed-timestep scenery clock plus frame-rate cap for the render loop
+
+    advance(now) runs the simulation ticks due and sets `time`, the scenery
+    time to draw (interpolated between ticks); next_frame_in(now) tells the
+    loop how long to sleep.
+    """
+
+    def __init__(self, tick=SIM_TICK, frame_cap=FRAME_CAP, idle_fps=IDLE_FPS, idle_after=IDLE_AFTER,
+                 clock=time.perf_counter):
+        self.tick = tick
+        self.frame_cap = frame_cap
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.clock = clock
+
+        now = clock()
+        self.ticks = 0 # Simulation ticks run
+        self.time = 0.0 # Interpolated scenery time for the frame being drawn
+        self.dropped = 0.0 # Seconds skipped because frames were too slow
+        self._accumulator = 0.0
+        self._last = now
+        self.last_activity = now
+        self.last_frame = None
+
+    @property
+    def sim_time(self):
+        """Scenery time after the last tick"""
+        return self.ticks * self.tick
+
+    @property
+    def alpha(self):
+        """How far the frame is between the last tick and the next one (0..1)"""
+        return self._accumulator / self.tick
+
+    def advance(self, now=None, simulate=None):
+        """Run the ticks due by `now` (calling simulate(tick) for each); returns how many ran"""
+        if now is None:
+            now = self.clock()
+        self._accumulator += max(now - self._last, 0.0)
+        self._last = now
+
+        ticks = min(int(self._accumulator / self.tick), MAX_TICKS_PER_FRAME)
+        for _ in range(ticks):
+            if simulate is not None:
+                simulate(self.tick)
+        self.ticks += ticks
+        self._accumulator -= ticks * self.tick
+        if self._accumulator >= self.tick:
+            self.dropped += self._accumulator - self._accumulator % self.tick
+            self._accumulator %= self.tick
+
+        # Drawing lags one tick behind so it can blend the last two
+        self.time = self.sim_time - self.tick + self.alpha * self.tick
+        return ticks
+
+    # ------------------------------------------------------------------
+    # Frame rate
+    # ------------------------------------------------------------------
+
+    def poke(self, now=None):
+        """Something happened (input, game animation): draw at the full rate"""
+        self.last_activity = self.clock() if now is None else now
+
+    def idle(self, now=None):
+        if now is None:
+            now = self.clock()
+        return now - self.last_activity >= self.idle_after
+
+    def frame_interval(self, now=None):
+        if self.idle(now):
+            return 1.0 / self.idle_fps
+        return 1.0 / self.frame_cap if self.frame_cap else 0.0
+
+    def next_frame_in(self, now=None):
+        """Seconds until the next frame is due (0: draw now)"""
+        if now is None:
+            now = self.clock()
+        if self.last_frame is None:
+            return 0.0
+        return max(self.last_frame + self.frame_interval(now) - now, 0.0)
+
+    def frame_started(self, now=None):
+        self.last_frame = self.clock() if now is None else now
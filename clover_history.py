@@ -0,0 +1,124 @@
+"""
+
+Clover: Minesweeper 3D - Undo History
+
+Each player action is recorded as a compact delta: the flat indices of the
+cubes it changed with their old and new plane values, the mines it moved,
+and the counters (score, scanner charges, ...) that differ afterwards.
+Undo and redo replay those deltas, so they cost time proportional to the
+change rather than to the board, and the history keeps at most `limit`
+actions.
+
+"""
+
+from collections import deque
+
+import numpy as np
+
+# Game attributes restored by undo/redo
+COUNTERS = ("score", "safe_cubes_revealed", "flags_count", "scanner_uses", "game_over")
+
+class Delta:
+    """Everything one action changed"""
+
+    __slots__ = ("planes", "mines", "counters")
+
+    def __init__(self):
+        self.planes = [] # (plane name, flat indices, old values, new values)
+        self.mines = []  # (x, y, z, old value)
+        self.counters = {} # name -> (old, new)
+
+    def __bool__(self):
+        return bool(self.planes or self.mines or self.counters)
+
+    @property
+    def nbytes(self):
+        return sum(cells.nbytes + old.nbytes + new.nbytes for _, cells, old, new in self.planes)
+
+class History:
+    """Bounded undo/redo stacks of Deltas, with one action open at a time"""
+
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.clear()
+
+    def clear(self):
+        self.undo_stack = deque(maxlen=self.limit)
+        self.redo_stack = []
+        self.current = None
+        self._before = None
+
+    @property
+    def recording(self):
+        return self.limit > 0
+
+    def begin(self, game):
+        """Open an action (no-op if one is already open)"""
+        if self.recording and self.current is None:
+            self.current = Delta()
+            self._before = tuple(getattr(game, name) for name in COUNTERS)
+
+    def cells(self, plane, cells, old, new):
+        """Record plane values changed by the open action (flat indices over the board)"""
+        if self.current is not None and len(cells):
+            self.current.planes.append((plane, np.asarray(cells, dtype=np.int32),
+                                        np.asarray(old).copy(), np.asarray(new).copy()))
+
+    def mine(self, x, y, z, old):
+        if self.current is not None:
+            self.current.mines.append((x, y, z, old))
+
+    def commit(self, game):
+        """Close the open action; it becomes the newest undo step if it changed anything"""
+        delta = self.current
+        if delta is None:
+            return
+        for name, old in zip(COUNTERS, self._before):
+            new = getattr(game, name)
+            if new != old:
+                delta.counters[name] = (old, new)
+        self.current = None
+        self._before = None
+        if delta:
+            self.undo_stack.append(delta)
+            self.redo_stack.clear()
+
+    def can_undo(self):
+        return self.current is None and bool(self.undo_stack)
+
+    def can_redo(self):
+        return self.current is None and bool(self.redo_stack)
+
+    def undo(self, game):
+        """Revert the newest action; returns the flat indices whose revealed state changed"""
+        delta = self.undo_stack.pop()
+        changed = self._apply(game, delta, undo=True)
+        self.redo_stack.append(delta)
+        return changed
+
+    def redo(self, game):
+        delta = self.redo_stack.pop()
+        changed = self._apply(game, delta, undo=False)
+        self.undo_stack.append(delta)
+        return changed
+
+    @staticmethod
+    def _apply(game, delta, undo):
+        board = game.grid
+        revealed = []
+
+        # Planes: later changes are undone first
+        planes = reversed(delta.planes) if undo else delta.planes
+        for name, cells, old, new in planes:
+            getattr(board, name).reshape(-1)[cells] = old if undo else new
+            if name == "revealed":
+                revealed.append(cells)
+
+        mines = reversed(delta.mines) if undo else delta.mines
+        for x, y, z, old in mines:
+            board.set_mine(x, y, z, old if undo else not old)
+
+        for name, (old, new) in delta.counters.items():
+            setattr(game, name, old if undo else new)
+
+        return np.concatenate(revealed) if revealed else np.empty(0, dtype=np.int32)
@@ -0,0 +1,179 @@
+"""
+
+Clover: Minesweeper 3D - Cube Indexes
+
+Incrementally maintained indexes over the unrevealed cubes of a layer, so
+selection movement and mouse picking never have to scan the board.
+
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+
+SMALL_BATCH = 16 # Up to this many changed cubes are patched one by one; more rebuild whole rows/columns
+
+class UnrevealedIndex:
+    """Ordered per-row and per-column sets of the unrevealed cubes of one layer
+
+    `revealed` is the layer's (height, width) revealed plane; the index reads
+    it directly, so after cubes change call refresh() with their flat
+    (y * width + x) indices.
+    """
+
+    def __init__(self, revealed):
+        self.revealed = revealed
+        self.height, self.width = revealed.shape
+        self.rebuild()
+
+    def rebuild(self):
+        hidden = ~self.revealed
+        self.rows = [np.flatnonzero(hidden[y]).tolist() for y in range(self.height)]
+        self.columns = [np.flatnonzero(hidden[:, x]).tolist() for x in range(self.width)]
+        self.nonempty_rows = [y for y in range(self.height) if self.rows[y]]
+        self.count = int(np.count_nonzero(hidden))
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, cell):
+        x, y = cell
+        row = self.rows[y]
+        i = bisect_left(row, x)
+        return i < len(row) and row[i] == x
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def refresh(self, cells):
+        """Bring the index up to date for cubes whose revealed state changed"""
+        cells = np.asarray(cells, dtype=np.intp).ravel()
+        if len(cells) <= SMALL_BATCH:
+            for cell in cells.tolist():
+                y, x = divmod(cell, self.width)
+                if self.revealed[y, x]:
+                    self._remove(x, y)
+                else:
+                    self._add(x, y)
+            return
+
+        # Big batches (flood fills): rebuild only the rows and columns they touch
+        hidden = ~self.revealed
+        for y in np.unique(cells // self.width).tolist():
+            was_empty = not self.rows[y]
+            self.count -= len(self.rows[y])
+            self.rows[y] = np.flatnonzero(hidden[y]).tolist()
+            self.count += len(self.rows[y])
+            self._row_emptiness_changed(y, was_empty)
+        for x in np.unique(cells % self.width).tolist():
+            self.columns[x] = np.flatnonzero(hidden[:, x]).tolist()
+
+    def _remove(self, x, y):
+        row = self.rows[y]
+        i = bisect_left(row, x)
+        if i == len(row) or row[i] != x:
+            return
+        del row[i]
+        column = self.columns[x]
+        del column[bisect_left(column, y)]
+        self.count -= 1
+        self._row_emptiness_changed(y, False)
+
+    def _add(self, x, y):
+        row = self.rows[y]
+        i = bisect_left(row, x)
+        if i < len(row) and row[i] == x:
+            return
+        was_empty = not row
+        row.insert(i, x)
+        insort(self.columns[x], y)
+        self.count += 1
+        self._row_emptiness_changed(y, was_empty)
+
+    def _row_emptiness_changed(self, y, was_empty):
+        is_empty = not self.rows[y]
+        if was_empty and not is_empty:
+            insort(self.nonempty_rows, y)
+        elif is_empty and not was_empty:
+            del self.nonempty_rows[bisect_left(self.nonempty_rows, y)]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _step(values, current, direction):
+        """Next value after `current` in a sorted list, wrapping around"""
+        if not values:
+            return None
+        if direction > 0:
+            i = bisect_right(values, current)
+            return values[i] if i < len(values) else values[0]
+        i = bisect_left(values, current)
+        return values[i - 1] if i > 0 else values[-1]
+
+    def next_in_row(self, x, y, direction=1):
+        """x of the next unrevealed cube left/right of (x, y), wrapping; None if the row is done"""
+        return self._step(self.rows[y], x, direction)
+
+    def next_in_column(self, x, y, direction=1):
+        """y of the next unrevealed cube above/below (x, y), wrapping; None if the column is done"""
+        return self._step(self.columns[x], y, direction)
+
+    def next_after(self, x, y):
+        """(x, y) of the next unrevealed cube in row-major order, wrapping; None if all revealed"""
+        if not self.nonempty_rows:
+            return None
+        row = self.rows[y] if 0 <= y < self.height else []
+        i = bisect_right(row, x)
+        if i < len(row):
+            return row[i], y
+
+        # First non-empty row below, or wrap to the top
+        i = bisect_right(self.nonempty_rows, y)
+        next_y = self.nonempty_rows[i] if i < len(self.nonempty_rows) else self.nonempty_rows[0]
+        return self.rows[next_y][0], next_y
+
+    def nearest(self, x, y):
+        """(x, y) of the unrevealed cube closest to (x, y), or None if all are revealed
+
+        Walks the non-empty rows outwards from y and bisects each row for the
+        closest x, stopping once a row is further away than the best match.
+        Ties go to the lower y, then the lower x.
+        """
+        rows = self.nonempty_rows
+        if not rows:
+            return None
+
+        best = None # (distance squared, y, x)
+        below = bisect_left(rows, y) # rows[below:] are >= y
+        above = below - 1            # rows[:below] are < y
+        while above >= 0 or below < len(rows):
+            # Take whichever side has the closer row (upper side on ties)
+            if below >= len(rows) or (above >= 0 and y - rows[above] <= rows[below] - y):
+                row_y = rows[above]
+                above -= 1
+            else:
+                row_y = rows[below]
+                below += 1
+
+            dy = row_y - y
+            if best is not None and dy * dy > best[0]:
+                break
+
+            row = self.rows[row_y]
+            i = bisect_left(row, x)
+            for row_x in row[max(i - 1, 0):i + 1]:
+                candidate = ((row_x - x) ** 2 + dy * dy, row_y, row_x)
+                if best is None or candidate < best:
+                    best = candidate
+
+        return best[2], best[1]
+
+    def first(self):
+        """(x, y) of the first unrevealed cube in row-major order, or None"""
+        if not self.nonempty_rows:
+            return None
+        y = self.nonempty_rows[0]
+        return self.rows[y][0], y
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+"""
+
+Clover: Minesweeper 3D - Input Journal and Replay
+
+Every player input a Game receives (reveal, flag, scan, answer typing, ...)
+can be journaled with its timestamp, next to the game's seed and
+configuration. A journal replays the exact same game: headlessly as fast as
+possible (regression checks, bug reports), or in real time in the GLUT
+frontend (REPLAY_PATH).
+
+Journals are JSON lines - a header, then one [seconds, method, args...] line
+per input - written as they happen, so a crash still leaves a usable file.
+
+    python clover_journal.py clover_journal.jsonl more/*.jsonl
+
+"""
+
+import base64
+import json
+import sys
+import time
+
+import numpy as np
+
+from clover_save import game_config, game_from_config
+
+JOURNAL_VERSION = 1
+
+class Journal:
+    """Seed, configuration and timestamped inputs of one game"""
+
+    def __init__(self, header, events=None, path=None):
+        self.header = header
+        self.events = events if events is not None else []
+        self.start = 0.0
+        self._file = None
+        if path is not None:
+            self._file = open(path, "w")
+            self._write(header)
+
+    @classmethod
+    def attach(cls, game, path=None):
+        """Start journaling `game` (optionally streaming to `path`) and return the journal"""
+        header = {
+            "journal": JOURNAL_VERSION,
+            "config": game_config(game),
+            # Named players deal from their saved problem history; replays start from the same one
+            "used_problems": base64.b64encode(game.problem_deck.used.bits.tobytes()).decode(),
+        }
+        journal = cls(header, path=path)
+        journal.start = game.clock()
+        game.journal = journal
+        return journal
+
+    def record(self, now, name, args, kwargs=None):
+        event = [now - self.start, name, *args]
+        if kwargs:
+            event.append(kwargs)
+        self.events.append(event)
+        if self._file:
+            self._write(event)
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def save(self, path):
+        with open(path, "w") as f:
+            for entry in [self.header, *self.events]:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get("journal") != JOURNAL_VERSION:
+            raise ValueError(f"{path}: not a Clover journal (version {JOURNAL_VERSION})")
+        return cls(lines[0], lines[1:])
+
+class ReplayClock:
+    """Time source of a replayed game: set to each event's time while it is applied"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class Replayer:
+    """Re-executes a journal on a fresh Game
+
+    run() replays everything at once; advance(now) replays the events that
+    are due by `now` (a clock in the same time base as `start`), for
+    real-time playback.
+    """
+
+    def __init__(self, journal, start=0.0, log=None, pregenerate=None):
+        self.journal = journal
+        self.start = start
+        self.clock = ReplayClock(start)
+
+        config = dict(journal.header["config"], player=None) # Never touch the player's problem file
+        self.game = game_from_config(config, clock=self.clock, log=log, pregenerate=pregenerate)
+        deck = self.game.problem_deck
+        deck.used.bits[:] = np.frombuffer(base64.b64decode(journal.header["used_problems"]), dtype=np.uint8)
+        deck.shuffle()
+
+        self.position = 0 # Next event
+
+    @property
+    def done(self):
+        return self.position >= len(self.journal.events)
+
+    def _apply(self, event):
+        game = self.game
+        self.clock.now = self.start + event[0]
+        game.step(self.clock.now) # Timeouts and layer changes that happened before this input
+        args = event[2:]
+        kwargs = args.pop() if args and isinstance(args[-1], dict) else {}
+        getattr(game, event[1])(*args, **kwargs)
+
+    def advance(self, now):
+        """Apply every event due by `now`; returns how many were applied"""
+        events = self.journal.events
+        applied = 0
+        while self.position < len(events) and self.start + events[self.position][0] <= now:
+            self._apply(events[self.position])
+            self.position += 1
+            applied += 1
+        self.clock.now = max(self.clock.now, now)
+        return applied
+
+    def run(self):
+        """Replay the whole journal headlessly; returns the game"""
+        events = self.journal.events
+        for event in events[self.position:]:
+            self._apply(event)
+        self.position = len(events)
+        return self.game
+
+def replay_summary(game):
+    return {
+        "score": game.score,
+        "layer": game.current_layer,
+        "game_over": game.game_over,
+        "won": game.won,
+        "safe_cubes_revealed": game.safe_cubes_revealed,
+        "problems_used": game.problems_used,
+    }
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+
+    for path in paths:
+        journal = Journal.load(path)
+        start = time.perf_counter()
+        game = Replayer(journal).run()
+        elapsed = time.perf_counter() - start
+        rate = len(journal.events) / elapsed / 1000 if elapsed > 0 else 0.0
+        print(json.dumps({"journal": path, "events": len(journal.events),
+                          "ms": round(elapsed * 1000, 3), "events_per_ms": round(rate, 1),
+                          **replay_summary(game)}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
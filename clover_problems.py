@@ -0,0 +1,331 @@
+"""
+
+Clover: Minesweeper 3D - Mini-Game Problems
+
+Every problem the mini-game can ask is enumerated once, by a set of pluggable
+generators, into integer tables sorted by difficulty level. A ProblemDeck
+deals problem indices of a requested level from lazily shuffled per-level
+pools, so every draw is O(1) however big the problem space gets, nothing
+repeats until a tier runs out, and text is only built for display.
+
+Which problems were used is a bitset keyed by problem index. It can live in a
+small memory-mapped file per player, so problems keep not repeating across
+sessions.
+
+"""
+
+import os
+import random
+import re
+from functools import lru_cache
+
+import numpy as np
+
+OPERATORS = ('+', '-', '*', '/')
+OPERATOR_TEXT = {'+': '+', '-': '-', '*': 'x', '/': '/'}
+NO_OPERATOR = -1 # op2 of single-step problems
+
+LEVELS = 10 # Difficulty levels 0 (easiest) .. LEVELS - 1
+
+# Difficulty levels (low, high) dealt on each layer; deeper layers use the last tier
+TIERS = ((0, 2), (1, 4), (3, 6), (5, 8), (6, 9))
+
+# ----------------------------------------------------------------------
+# Generators: generator() -> dict of equally long arrays
+#   a, op, b, op2, c (op2 = NO_OPERATOR for single-step problems), answer, level
+# ----------------------------------------------------------------------
+
+def _pairs(low, high, b_low=None, b_high=None):
+    a, b = np.meshgrid(np.arange(low, high + 1, dtype=np.int32),
+                       np.arange(b_low or low, (b_high or high) + 1, dtype=np.int32), indexing='ij')
+    return a.ravel(), b.ravel()
+
+def _table(a, op, b, answer, level, op2=None, c=None):
+    n = len(a)
+    return {
+        'a': a,
+        'op': np.full(n, op, dtype=np.int8),
+        'b': b,
+        'op2': np.full(n, NO_OPERATOR if op2 is None else op2, dtype=np.int8),
+        'c': np.zeros(n, dtype=np.int32) if c is None else c,
+        'answer': answer.astype(np.int32),
+        'level': np.clip(level, 0, LEVELS - 1).astype(np.int8),
+    }
+
+def addition(low=1, high=25):
+    """a + b; harder with two-digit operands and a carry"""
+    a, b = _pairs(low, high)
+    carry = (a % 10 + b % 10) >= 10
+    return _table(a, 0, b, a + b, (a > 9).astype(int) + (b > 9) + carry)
+
+def subtraction(low=1, high=25):
+    """a - b with a >= b (never negative); harder with two-digit operands and a borrow"""
+    a, b = _pairs(low, high)
+    keep = a >= b
+    a, b = a[keep], b[keep]
+    borrow = (a % 10) < (b % 10)
+    return _table(a, 1, b, a - b, (a > 9).astype(int) + (b > 9) + borrow)
+
+def multiplication(low=1, high=25):
+    """a x b; harder as the smaller factor and the product grow"""
+    a, b = _pairs(low, high)
+    small, large = np.minimum(a, b), np.maximum(a, b)
+    return _table(a, 2, b, a * b, 1 + (small > 5).astype(int) + (small > 10) + (large > 10) + (a * b > 100))
+
+def division(low=1, high=25, divisor_low=2, divisor_high=12):
+    """(q * d) / d, so the answer is always a whole number"""
+    quotient, divisor = _pairs(low, high, divisor_low, divisor_high)
+    dividend = quotient * divisor
+    level = 2 + (divisor > 5).astype(int) + (quotient > 10) + (dividend > 100)
+    return _table(dividend, 3, divisor, quotient, level)
+
+def two_step(low=1, high=12, max_answer=200):
+    """a op b op c with +, - and x, usual precedence, no negative intermediate results"""
+    values = np.arange(low, high + 1, dtype=np.int32)
+    a, b, c = (axis.ravel() for axis in np.meshgrid(values, values, values, indexing='ij'))
+    tables = []
+    for op in range(3):
+        for op2 in range(3):
+            if op2 == 2 and op != 2:
+                # a + b x c, a - b x c: the product binds first
+                answer = a + b * c if op == 0 else a - b * c
+                partial = answer
+            else:
+                partial = (a + b, a - b, a * b)[op]
+                answer = (partial + c, partial - c, partial * c)[op2]
+            keep = (partial >= 0) & (answer >= 0) & (answer <= max_answer)
+            ka, kb, kc, answer = a[keep], b[keep], c[keep], answer[keep]
+            level = (5 + (op == 2 or op2 == 2) + (answer > 50).astype(int) + (answer > 100)
+                     + (np.maximum(ka, np.maximum(kb, kc)) > 9))
+            tables.append(_table(ka, op, kb, answer, level, op2, kc))
+    return {key: np.concatenate([t[key] for t in tables]) for key in tables[0]}
+
+GENERATORS = {
+    'addition': addition,
+    'subtraction': subtraction,
+    'multiplication': multiplication,
+    'division': division,
+    'two_step': two_step,
+}
+
+def build_problem_table(generators=None):
+    """Concatenate the generators' problems, stably sorted by difficulty level
+
+    Tables are built once per set of generators and shared (read-only).
+    """
+    if generators is None:
+        generators = GENERATORS.values()
+    return _problem_table(tuple(generators))
+
+@lru_cache(maxsize=8)
+def _problem_table(generators):
+    tables = [generate() for generate in generators]
+    table = {key: np.concatenate([t[key] for t in tables]) for key in tables[0]}
+    order = np.argsort(table['level'], kind='stable')
+    table = {key: column[order] for key, column in table.items()}
+    for column in table.values():
+        column.flags.writeable = False
+    return table
+
+def tier_for_layer(layer, offset=0):
+    """Difficulty levels (low, high) of the problems asked on a layer, shifted by `offset` levels"""
+    low, high = TIERS[min(layer, len(TIERS) - 1)]
+    if offset:
+        low = min(max(low + offset, 0), LEVELS - 1)
+        high = min(max(high + offset, 0), LEVELS - 1)
+    return low, high
+
+# ----------------------------------------------------------------------
+# Used problems
+# ----------------------------------------------------------------------
+
+# Used-problem files: 4 byte magic + little-endian uint32 problem count, then the bits
+STORE_MAGIC = b"CLVP"
+STORE_HEADER = 8
+
+def store_path(player, directory=None):
+    """Used-problem file of a player (under $CLOVER_HOME, default ~/.clover)"""
+    if directory is None:
+        directory = os.environ.get("CLOVER_HOME") or os.path.join(os.path.expanduser("~"), ".clover")
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", player) or "_"
+    return os.path.join(directory, f"problems-{name}.bits")
+
+class UsedProblems:
+    """Bitset of used problem indices, in memory or memory-mapped from `path`
+
+    A file whose header doesn't match `size` (e.g. the problem table changed)
+    is started over.
+    """
+
+    def __init__(self, size, path=None):
+        self.size = size
+        self.path = path
+        nbytes = STORE_HEADER + (size + 7) // 8
+        header = np.frombuffer(STORE_MAGIC + np.array([size], '<u4').tobytes(), dtype=np.uint8)
+
+        if path is None:
+            self._data = np.zeros(nbytes, dtype=np.uint8)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._data = None
+            if os.path.exists(path) and os.path.getsize(path) == nbytes:
+                self._data = np.memmap(path, dtype=np.uint8, mode='r+', shape=(nbytes,))
+                if not np.array_equal(self._data[:STORE_HEADER], header):
+                    self._data = None
+            if self._data is None:
+                self._data = np.memmap(path, dtype=np.uint8, mode='w+', shape=(nbytes,))
+        self._data[:STORE_HEADER] = header
+        self.bits = self._data[STORE_HEADER:]
+
+    def __contains__(self, index):
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def add(self, index):
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def _unpacked(self):
+        return np.unpackbits(self.bits, count=self.size, bitorder='little')
+
+    def count(self):
+        return int(np.count_nonzero(self._unpacked()))
+
+    def clear(self, start=0, stop=None):
+        """Forget the used problems in [start, stop)"""
+        if start == 0 and stop is None:
+            self.bits[:] = 0
+            return
+        flags = self._unpacked()
+        flags[start:stop] = 0
+        self.bits[:] = np.packbits(flags, bitorder='little')
+
+    def unused(self, start=0, stop=None):
+        """Sorted indices in [start, stop) of the problems not used yet"""
+        return start + np.flatnonzero(self._unpacked()[start:stop] == 0)
+
+    def flush(self):
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+
+# ----------------------------------------------------------------------
+# Dealing
+# ----------------------------------------------------------------------
+
+class _Pool:
+    """Lazily shuffled remaining problems of one difficulty level"""
+
+    __slots__ = ('indices', 'swaps', 'next')
+
+    def __init__(self, indices):
+        self.indices = indices
+        self.swaps = {} # Sparse Fisher-Yates: only positions that were swapped are stored
+        self.next = 0
+
+    def __len__(self):
+        return len(self.indices) - self.next
+
+    def draw(self, rng):
+        # One step of Fisher-Yates over a virtual permutation of the pool
+        i = self.next
+        j = rng.randrange(i, len(self.indices))
+        chosen = int(self.indices[self.swaps.get(j, j)])
+        self.swaps[j] = self.swaps.pop(i, i)
+        self.next += 1
+        return chosen
+
+class ProblemDeck:
+    """Deals unique problem indices of a target difficulty in a seeded random order
+
+    With a `path` the used problems are kept in that file (see store_path), so
+    a new deck on the same file only deals what earlier sessions didn't.
+    """
+
+    def __init__(self, seed=None, path=None, generators=None):
+        table = build_problem_table(generators)
+        self.a, self.op, self.b = table['a'], table['op'], table['b']
+        self.op2, self.c = table['op2'], table['c']
+        self.answers, self.levels = table['answer'], table['level']
+        self.size = len(self.answers)
+
+        # Problems of level d are the index range level_start[d]:level_start[d + 1]
+        self.level_start = np.searchsorted(self.levels, np.arange(LEVELS + 1)).tolist()
+
+        self.used = UsedProblems(self.size, path)
+        self.rng = random.Random(seed)
+        self.cycles = 0 # Times a tier ran out of problems and was reshuffled
+        self.shuffle()
+
+    def shuffle(self):
+        """Start fresh passes over the problems not used yet"""
+        self._pools = [None] * LEVELS # Built on first use
+        self.dealt = self.used.count()
+
+    def __len__(self):
+        return self.size - self.dealt
+
+    def level_size(self, level):
+        return self.level_start[level + 1] - self.level_start[level]
+
+    def remaining(self, level):
+        """Problems of a level not dealt yet"""
+        pool = self._pools[level]
+        if pool is None:
+            pool = self._pools[level] = _Pool(self.used.unused(self.level_start[level],
+                                                               self.level_start[level + 1]))
+        return len(pool)
+
+    def _recycle(self, low, high):
+        """Every problem of levels low..high was used: make them all available again"""
+        start, stop = self.level_start[low], self.level_start[high + 1]
+        self.used.clear(start, stop)
+        self.dealt -= stop - start
+        for level in range(low, high + 1):
+            self._pools[level] = None
+        self.cycles += 1
+
+    def deal(self, low=0, high=LEVELS - 1):
+        """Next problem index with a difficulty level in low..high
+
+        A target level is picked at random; if it has no problems left the
+        nearest level of the tier that has is used instead. Once the whole
+        tier was dealt it is reshuffled (and counts a cycle).
+        """
+        if not any(self.remaining(level) for level in range(low, high + 1)):
+            if not any(self.level_size(level) for level in range(low, high + 1)):
+                raise ValueError(f"no problems with a difficulty level in {low}..{high}")
+            self._recycle(low, high)
+
+        target = self.rng.randint(low, high)
+        for distance in range(high - low + 1):
+            for level in (target - distance, target + distance):
+                if low <= level <= high and self.remaining(level):
+                    chosen = self._pools[level].draw(self.rng)
+                    self.used.add(chosen)
+                    self.dealt += 1
+                    return chosen
+
+    def flush(self):
+        """Write the used problems through to disk (a no-op without a file)"""
+        self.used.flush()
+
+    # Display helpers - strings are only built here
+
+    def answer(self, index):
+        return int(self.answers[index])
+
+    def level(self, index):
+        return int(self.levels[index])
+
+    def operator(self, index):
+        return OPERATORS[self.op[index]]
+
+    def _terms(self, index, texts):
+        terms = f"{self.a[index]} {texts[OPERATORS[self.op[index]]]} {self.b[index]}"
+        if self.op2[index] != NO_OPERATOR:
+            terms += f" {texts[OPERATORS[self.op2[index]]]} {self.c[index]}"
+        return terms
+
+    def text(self, index):
+        return f"{self._terms(index, OPERATOR_TEXT)} = ?"
+
+    def problem_id(self, index):
+        return self._terms(index, {op: op for op in OPERATORS}).replace(" ", ",")
@@ -0,0 +1,676 @@
+"""
+
+Clover: Minesweeper 3D - Batched Rendering
+
+The cubes of a board are drawn from per-vertex arrays built for the whole
+board at once (positions, normals, colors), kept in vertex buffer objects
+when the driver has them and in client-side arrays otherwise. Each frame
+only the cubes whose color changed are re-uploaded, and all cubes, outlines
+and markers take a handful of draw calls instead of a dozen GL calls each.
+
+"""
+
+import math
+
+import numpy as np
+from OpenGL.GL import *
+
+DESTRUCTION_SPIN = 360.0 # Degrees a destroyed cube turns while it shrinks away
+MAX_UPLOAD_RUNS = 64 # More scattered changes than this upload one covering range instead
+
+# ----------------------------------------------------------------------
+# Meshes
+# ----------------------------------------------------------------------
+
+def cube_quads():
+    """Unit cube around the origin as 6 quads: 24 vertices and their normals"""
+    vertices, normals = [], []
+    for axis in range(3):
+        u, v = [a for a in range(3) if a != axis]
+        for sign in (-1.0, 1.0):
+            for du, dv in ((-1, -1), (1, -1), (1, 1), (-1, 1)):
+                vertex = [0.0, 0.0, 0.0]
+                vertex[axis], vertex[u], vertex[v] = sign * 0.5, du * 0.5, dv * 0.5
+                normal = [0.0, 0.0, 0.0]
+                normal[axis] = sign
+                vertices.append(vertex)
+                normals.append(normal)
+    return np.array(vertices, dtype=np.float32), np.array(normals, dtype=np.float32)
+
+def cube_edges():
+    """Unit cube around the origin as 12 lines (24 vertices)"""
+    corners = [(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)]
+    lines = [(a, b) for i, a in enumerate(corners) for b in corners[i + 1:]
+             if sum(p != q for p, q in zip(a, b)) == 1]
+    return np.array(lines, dtype=np.float32).reshape(-1, 3)
+
+def cube_triangles():
+    """cube_quads() split into 12 triangles"""
+    vertices, normals = cube_quads()
+    order = (np.arange(6)[:, None] * 4 + [0, 1, 2, 0, 2, 3]).reshape(-1)
+    return vertices[order], normals[order]
+
+def sphere_triangles(slices=8, stacks=6):
+    """Unit UV sphere as triangles: vertices (which are also the normals)"""
+    theta = np.linspace(0.0, math.pi, stacks + 1)[:, None]
+    phi = np.linspace(0.0, 2 * math.pi, slices + 1)[None, :]
+    points = np.stack([np.sin(theta) * np.cos(phi),
+                       np.cos(theta) * np.ones_like(phi),
+                       np.sin(theta) * np.sin(phi)], axis=-1)
+    a, b = points[:-1, :-1], points[1:, :-1]
+    c, d = points[1:, 1:], points[:-1, 1:]
+    triangles = np.stack([a, b, c, a, c, d], axis=2).reshape(-1, 3)
+    return triangles.astype(np.float32)
+
+def spin(vertices, angles, axis=(1.0, 1.0, 1.0)):
+    """Rotate (n, v, 3) vertices about `axis` by per-row angles in degrees (like glRotatef)"""
+    k = np.asarray(axis, dtype=np.float32)
+    k = k / np.linalg.norm(k)
+    radians = np.radians(angles).astype(np.float32)[:, None, None]
+    cos, sin = np.cos(radians), np.sin(radians)
+    return vertices * cos + np.cross(k, vertices) * sin + k * (vertices @ k)[..., None] * (1 - cos)
+
+# ----------------------------------------------------------------------
+# Buffers
+# ----------------------------------------------------------------------
+
+class ArrayBuffer:
+    """Float32 rows of a vertex attribute, mirrored in a VBO when one is available
+
+    `data` is the CPU copy; after changing rows of it, upload() them.
+    Without VBO support the arrays are handed to GL directly each draw.
+    """
+
+    def __init__(self, data, use_vbo=True):
+        self.data = np.ascontiguousarray(data, dtype=np.float32)
+        self.id = None
+        if use_vbo and len(self.data):
+            self.id = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.id)
+            glBufferData(GL_ARRAY_BUFFER, self.data.nbytes, self.data, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def __len__(self):
+        return len(self.data)
+
+    def upload(self, start=0, stop=None):
+        """Copy rows [start, stop) to the GPU"""
+        if self.id is None:
+            return
+        stop = len(self.data) if stop is None else stop
+        if stop <= start:
+            return
+        row = self.data.strides[0]
+        glBindBuffer(GL_ARRAY_BUFFER, self.id)
+        glBufferSubData(GL_ARRAY_BUFFER, start * row, (stop - start) * row, self.data[start:stop])
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def upload_groups(self, groups, group_rows):
+        """Upload the rows of the given (sorted) groups of `group_rows` rows each"""
+        if len(groups) == 0:
+            return
+        breaks = np.flatnonzero(np.diff(groups) > 1)
+        if len(breaks) >= MAX_UPLOAD_RUNS:
+            self.upload(groups[0] * group_rows, (groups[-1] + 1) * group_rows)
+            return
+        starts = np.concatenate(([groups[0]], groups[breaks + 1]))
+        ends = np.concatenate((groups[breaks], [groups[-1]])) + 1
+        for start, end in zip(starts, ends):
+            self.upload(start * group_rows, end * group_rows)
+
+    def source(self):
+        """Pointer argument for gl*Pointer (binds the VBO, if any)"""
+        if self.id is None:
+            return self.data
+        glBindBuffer(GL_ARRAY_BUFFER, self.id)
+        return None
+
+    def delete(self):
+        if self.id is not None:
+            glDeleteBuffers(1, [self.id])
+            self.id = None
+
+# ----------------------------------------------------------------------
+# Cube colors
+# ----------------------------------------------------------------------
+
+FLAGGED_COLOR = (1.0, 0.2, 0.2) # Bright red
+MINE_COLOR = (0.8, 0.0, 0.0) # Dark red for a revealed mine
+HACK_COLOR = (0.6, 0.1, 0.8) # Purple: mine shown in hack mode
+HOVER_COLOR = (0.4, 1.0, 0.4) # Bright green
+
+# Revealed safe cubes by adjacent mine count (more than 8 only happens across layers)
+ADJACENT_COLORS = np.array([
+    (0.2, 0.8, 0.2), # 0 mines - bright green
+    (0.3, 0.7, 0.4), # 1 mine - green
+    (0.4, 0.6, 0.5), # 2 mines - yellow-green
+    (0.6, 0.6, 0.2), # 3 mines - yellow
+    (0.7, 0.5, 0.1), # 4 mines - orange
+    (0.8, 0.4, 0.0), # 5 mines - orange-red
+    (0.9, 0.2, 0.0), # 6 mines - red
+    (1.0, 0.1, 0.1), # 7 mines - bright red
+    (1.0, 0.0, 0.2), # 8 mines - crimson
+    (1.0, 0.0, 0.0), # more
+], dtype=np.float32)
+
+# Clover leaves on revealed cubes, one per adjacent mine
+LEAF_COLORS = np.array([
+    (1.0, 1.0, 0.0), # Yellow
+    (0.0, 1.0, 0.0), # Green
+    (0.0, 0.5, 1.0), # Blue
+    (1.0, 0.5, 0.0), # Orange
+    (1.0, 0.0, 0.5), # Pink
+    (0.5, 0.0, 1.0), # Purple
+    (1.0, 0.0, 0.0), # Red
+    (0.0, 1.0, 1.0), # Cyan
+], dtype=np.float32)
+
+def unrevealed_colors(board):
+    """Colorful unrevealed cubes with subtle variation by position"""
+    z, y, x = np.indices(board.shape).reshape(3, -1)
+    hue = ((x * 0.1 + y * 0.15) % 1.0).astype(np.float32)
+    colors = np.empty((board.size, 3), dtype=np.float32)
+    colors[:] = (0.5, 0.4, 0.3) # Teal spectrum
+    colors[:, 2] += hue
+    purple = hue < 0.66
+    colors[purple] = (0.4, 0.3, 0.6) # Purple spectrum
+    colors[purple, 1] += hue[purple]
+    blue = hue < 0.33
+    colors[blue] = (0.3, 0.4, 0.7) # Blue spectrum
+    colors[blue, 0] += hue[blue]
+    return colors
+
+def cube_colors(board, base, selected=None, pulse=1.0):
+    """Color of every cube, flat in (z, y, x) order (`base`: unrevealed_colors)
+
+    In increasing priority: position hue, selection (`pulse` brightness),
+    hover, hack-mode mine, revealed, flagged.
+    """
+    colors = base.copy()
+    if selected is not None:
+        colors[selected] = (1.0, 1.0, pulse)
+    if board.hover_cell is not None:
+        z, y, x = board.hover_cell
+        colors[(z * board.height + y) * board.width + x] = HOVER_COLOR
+
+    has_mine = board.has_mine.reshape(-1)
+    revealed = board.revealed.reshape(-1)
+    if board.mines_revealed:
+        colors[has_mine] = HACK_COLOR
+    adjacent = np.minimum(board.adjacent_mines.reshape(-1), len(ADJACENT_COLORS) - 1)
+    colors[revealed] = ADJACENT_COLORS[adjacent[revealed]]
+    colors[revealed & has_mine] = MINE_COLOR
+    colors[board.flagged.reshape(-1)] = FLAGGED_COLOR
+    return colors
+
+# ----------------------------------------------------------------------
+# Cubes
+# ----------------------------------------------------------------------
+
+class CubeRenderer:
+    """Draws every cube of a board (plus outlines, clover leaves and hack-mode mines) in a few batches"""
+
+    def __init__(self, cube_size=50, destruction_duration=1.0):
+        self.cube_size = cube_size
+        self.destruction_duration = destruction_duration
+        self.use_vbo = None # Decided on the first draw, once there is a GL context
+        self.board = None
+
+        vertices, self.quad_normals = cube_quads()
+        self.quad_local = vertices * cube_size
+        self.edge_local = cube_edges() * (cube_size + 1)
+
+        # Marker meshes, relative to the cube center
+        sphere = sphere_triangles(6, 4)
+        self.leaf_mesh = (sphere * 4, sphere)
+        top = cube_size / 2 + 12
+        ball = sphere_triangles(8, 6)
+        spike, spike_normals = cube_triangles()
+        parts = [(ball * 6 + (0, top, 0), ball, (1.0, 0.3, 0.0))] # Orange mine
+        for i in range(6): # Spikes to make it look more mine-like
+            angle = math.radians(i * 60)
+            offset = (8 * math.cos(angle), top, 8 * math.sin(angle))
+            parts.append((spike * 3 + offset, spike_normals, (0.8, 0.2, 0.0)))
+        self.mine_mesh = (np.concatenate([v for v, _, _ in parts]).astype(np.float32),
+                          np.concatenate([n for _, n, _ in parts]),
+                          np.concatenate([np.tile(c, (len(v), 1)) for v, _, c in parts]).astype(np.float32))
+
+    def _buffer(self, data):
+        return ArrayBuffer(data, self.use_vbo)
+
+    def _delete(self):
+        for name in ("positions", "normals", "colors", "edges", "marker_positions", "marker_normals",
+                     "marker_colors"):
+            buffer = getattr(self, name, None)
+            if buffer is not None:
+                buffer.delete()
+
+    def _rebuild(self, board):
+        """New board: build every array from scratch"""
+        self._delete()
+        self.board = board
+        n = board.size
+        self.centers = np.stack([board.world_x.reshape(-1), board.world_y.reshape(-1),
+                                 board.world_z.reshape(-1)], axis=1).astype(np.float32)
+        self.base_colors = unrevealed_colors(board)
+
+        self.positions = self._buffer((self.centers[:, None] + self.quad_local).reshape(-1, 3))
+        self.normals = self._buffer(np.tile(self.quad_normals, (n, 1)))
+        self.colors = self._buffer(np.zeros((n * 24, 3), dtype=np.float32))
+        self.edges = self._buffer((self.centers[:, None] + self.edge_local).reshape(-1, 3))
+        self.instance_colors = np.full((n, 3), -1.0, dtype=np.float32) # Nothing uploaded yet
+
+        self.marker_positions = self.marker_normals = self.marker_colors = None
+        self.leaves = self.mines = None
+        self.outline_revealed = self.outline_selected = None
+        self.pose = None # Destruction progress the arrays are posed at (None: at rest)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _update_colors(self, board, selected, pulse):
+        colors = cube_colors(board, self.base_colors, selected, pulse)
+        changed = np.flatnonzero((colors != self.instance_colors).any(axis=1))
+        if len(changed):
+            self.instance_colors[changed] = colors[changed]
+            self.colors.data.reshape(board.size, 24, 3)[changed] = colors[changed, None]
+            self.colors.upload_groups(changed, 24)
+
+    def _update_markers(self, board):
+        """Rebuild the leaf/mine markers when the set of them changed"""
+        has_mine = board.has_mine.reshape(-1)
+        revealed = board.revealed.reshape(-1)
+        leaves = np.where(revealed & ~has_mine, board.adjacent_mines.reshape(-1), 0).astype(np.int64)
+        mines = has_mine & ~revealed if board.mines_revealed else np.zeros_like(has_mine)
+        if (self.leaves is not None and np.array_equal(leaves, self.leaves)
+                and np.array_equal(mines, self.mines)):
+            return
+        self.leaves, self.mines = leaves, mines
+
+        # Leaves: the i-th of a cube's n leaves sits at angle 360 * i / n
+        owners = np.repeat(np.arange(board.size), leaves)
+        counts = leaves[owners]
+        index = np.arange(len(owners)) - np.repeat(np.cumsum(leaves) - leaves, leaves)
+        angles = 2 * np.pi * index / np.maximum(counts, 1)
+        offsets = np.stack([15 * np.cos(angles), np.full(len(owners), self.cube_size / 2 + 5),
+                            15 * np.sin(angles)], axis=1).astype(np.float32)
+        leaf, leaf_normals = self.leaf_mesh
+        leaf_local = offsets[:, None] + leaf
+        leaf_colors = np.repeat(LEAF_COLORS[index % len(LEAF_COLORS)], len(leaf), axis=0)
+
+        mine_owners = np.flatnonzero(mines)
+        mine, mine_normals, mine_colors = self.mine_mesh
+
+        self.marker_owners = np.concatenate([np.repeat(owners, len(leaf)), np.repeat(mine_owners, len(mine))])
+        self.marker_local = np.concatenate([leaf_local.reshape(-1, 3), np.tile(mine, (len(mine_owners), 1))])
+        self.marker_local_normals = np.concatenate([np.tile(leaf_normals, (len(owners), 1)),
+                                                    np.tile(mine_normals, (len(mine_owners), 1))])
+        for buffer in (self.marker_positions, self.marker_normals, self.marker_colors):
+            if buffer is not None:
+                buffer.delete()
+        self.marker_positions = self._buffer(self.centers[self.marker_owners] + self.marker_local)
+        self.marker_normals = self._buffer(self.marker_local_normals)
+        self.marker_colors = self._buffer(np.concatenate([leaf_colors, np.tile(mine_colors, (len(mine_owners), 1))]))
+        self.pose = None # New markers are at rest; pose them along with the cubes
+
+    def _update_outlines(self, board, selected):
+        """Vertex indices of the outlines, grouped by line width"""
+        revealed = board.revealed.reshape(-1)
+        if (self.outline_revealed is not None and self.outline_selected == selected
+                and np.array_equal(revealed, self.outline_revealed)):
+            return
+        self.outline_revealed, self.outline_selected = revealed.copy(), selected
+        others = np.ones(board.size, dtype=bool)
+        if selected is not None:
+            others[selected] = False # Drawn on its own, thicker
+        edges = np.arange(24, dtype=np.uint32)
+        self.revealed_edges = (np.flatnonzero(revealed & others)[:, None] * 24 + edges).astype(np.uint32).reshape(-1)
+        self.hidden_edges = (np.flatnonzero(~revealed & others)[:, None] * 24 + edges).astype(np.uint32).reshape(-1)
+
+    def _update_animation(self, board, now):
+        """Pose shrinking/spinning destroyed cubes; everything is re-uploaded while they move"""
+        offsets = board.destruction_offset.reshape(-1)
+        if not offsets.any():
+            return
+        elapsed = np.where(offsets > 0, np.clip(now - board.epoch - offsets, 0.0, self.destruction_duration), 0.0)
+        if self.pose is not None and np.array_equal(elapsed, self.pose):
+            return # Already posed like this (e.g. the animation is over)
+        self.pose = elapsed
+        scale = (1.0 - elapsed / self.destruction_duration).astype(np.float32)[:, None, None]
+        angles = elapsed * DESTRUCTION_SPIN
+        n = board.size
+
+        def pose(local, owners=None):
+            centers = self.centers if owners is None else self.centers[owners]
+            cube_angles = angles if owners is None else angles[owners]
+            cube_scale = scale if owners is None else scale[owners]
+            return spin(local, cube_angles) * cube_scale + centers[:, None]
+
+        self.positions.data[...] = pose(np.broadcast_to(self.quad_local, (n, 24, 3))).reshape(-1, 3)
+        self.normals.data[...] = spin(np.broadcast_to(self.quad_normals, (n, 24, 3)), angles).reshape(-1, 3)
+        self.edges.data[...] = pose(np.broadcast_to(self.edge_local, (n, 24, 3))).reshape(-1, 3)
+        for buffer in (self.positions, self.normals, self.edges):
+            buffer.upload()
+        if self.marker_positions is not None and len(self.marker_positions):
+            owners = self.marker_owners
+            self.marker_positions.data[...] = pose(self.marker_local[:, None], owners)[:, 0]
+            self.marker_normals.data[...] = spin(self.marker_local_normals[:, None], angles[owners])[:, 0]
+            self.marker_positions.upload()
+            self.marker_normals.upload()
+
+    # ------------------------------------------------------------------
+    # Drawing
+    # ------------------------------------------------------------------
+
+    def draw(self, board, selected=None, now=0.0, pulse_time=0.0):
+        """Draw `board` with `selected` (a Cube or None) highlighted; `now` is on the game clock"""
+        if self.use_vbo is None:
+            self.use_vbo = bool(glGenBuffers)
+        if board is not self.board:
+            self._rebuild(board)
+        if selected is not None:
+            selected = (selected.grid_z * board.height + selected.grid_y) * board.width + selected.grid_x
+
+        self._update_colors(board, selected, 0.8 + 0.2 * math.sin(pulse_time * 8))
+        self._update_markers(board)
+        self._update_outlines(board, selected)
+        self._update_animation(board, now)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.positions.source())
+        glNormalPointer(GL_FLOAT, 0, self.normals.source())
+
+        # Selection glow: a larger translucent shell around the selected cube
+        if selected is not None:
+            glEnable(GL_BLEND)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            pulse = 0.7 + 0.3 * math.sin(pulse_time * 10)
+            glColor4f(1.0, 1.0, 0.8, pulse * 0.5)
+            center = self.centers[selected]
+            glPushMatrix()
+            glTranslatef(*center)
+            glScalef(1.3, 1.3, 1.3)
+            glTranslatef(*-center)
+            glDrawArrays(GL_QUADS, selected * 24, 24)
+            glPopMatrix()
+            glDisable(GL_BLEND)
+
+        # Every cube, then every marker
+        glEnableClientState(GL_COLOR_ARRAY)
+        glColorPointer(3, GL_FLOAT, 0, self.colors.source())
+        glDrawArrays(GL_QUADS, 0, len(self.positions))
+        if len(self.marker_positions):
+            glVertexPointer(3, GL_FLOAT, 0, self.marker_positions.source())
+            glNormalPointer(GL_FLOAT, 0, self.marker_normals.source())
+            glColorPointer(3, GL_FLOAT, 0, self.marker_colors.source())
+            glDrawArrays(GL_TRIANGLES, 0, len(self.marker_positions))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+
+        # Outlines, one batch per line width
+        glVertexPointer(3, GL_FLOAT, 0, self.edges.source())
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        for edges, color, width in ((self.revealed_edges, (0.2, 0.2, 0.2), 1.0),
+                                    (self.hidden_edges, (0.1, 0.1, 0.1), 2.0)):
+            if len(edges):
+                glColor3f(*color)
+                glLineWidth(width)
+                glDrawElements(GL_LINES, len(edges), GL_UNSIGNED_INT, edges)
+        if selected is not None:
+            glColor3f(1.0, 1.0, 1.0) # Bright white outline for selected
+            glLineWidth(4.0)
+            glDrawArrays(GL_LINES, selected * 24, 24)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+# ----------------------------------------------------------------------
+# Baked scenery
+# ----------------------------------------------------------------------
+
+class DisplayList:
+    """GL calls of a draw function recorded once into a display list and replayed
+
+    call(key) re-records when `key` (e.g. the board size the geometry was
+    built for) differs from the one it was recorded with.
+    """
+
+    def __init__(self, draw):
+        self.draw = draw
+        self.id = None
+        self.key = None
+
+    def invalidate(self):
+        if self.id is not None:
+            glDeleteLists(self.id, 1)
+            self.id = None
+
+    def call(self, key=None):
+        if self.id is not None and key != self.key:
+            self.invalidate()
+        if self.id is None:
+            self.id = glGenLists(1)
+            glNewList(self.id, GL_COMPILE)
+            self.draw()
+            glEndList()
+            self.key = key
+        glCallList(self.id)
+
+# ----------------------------------------------------------------------
+# Grass
+# ----------------------------------------------------------------------
+
+class GrassField:
+    """Grass blades scattered once (with their own generator) into one vertex array
+
+    Wind sway is a shear matrix per phase group, so drawing costs `groups`
+    draw calls however many blades there are.
+    """
+
+    def __init__(self, width, depth, count=150, margin=400, clearance=50, ground=-30.0,
+                 heights=(12.0, 30.0), sway=3.0, groups=8, seed=42):
+        self.ground = ground
+        self.sway = sway # Tip displacement of an average blade
+        self.mean_height = sum(heights) / 2
+        self.groups = groups
+        self.use_vbo = None
+        self.vertices = self.colors = None
+
+        rng = np.random.default_rng(seed)
+        x = rng.uniform(-margin, width + margin, count)
+        z = rng.uniform(-margin, depth + margin, count)
+        height = rng.uniform(*heights, count)
+        green = rng.uniform(0.4, 0.7, count)
+        group = rng.integers(groups, size=count)
+
+        # No grass on the platform
+        keep = ~((x >= -clearance) & (x <= width + clearance) & (z >= -clearance) & (z <= depth + clearance))
+        order = np.argsort(group[keep], kind="stable")
+        x, z, height, green, group = (a[keep][order] for a in (x, z, height, green, group))
+        self.count = len(x)
+        self.group_starts = np.searchsorted(group, np.arange(groups + 1)) * 4
+
+        # Each blade is a thin quad standing on y = 0 (the draw moves it to the ground)
+        corners = np.array([(-0.8, 0.0), (0.8, 0.0), (0.8, 1.0), (-0.8, 1.0)], dtype=np.float32)
+        blades = np.empty((self.count, 4, 3), dtype=np.float32)
+        blades[..., 0] = x[:, None] + corners[:, 0]
+        blades[..., 1] = height[:, None] * corners[:, 1]
+        blades[..., 2] = z[:, None]
+        colors = np.zeros((self.count, 4, 3), dtype=np.float32)
+        colors[..., 0] = colors[..., 2] = 0.1
+        colors[..., 1] = green[:, None]
+        self._blades = blades.reshape(-1, 3)
+        self._colors = colors.reshape(-1, 3)
+
+    def draw(self, time):
+        if self.use_vbo is None:
+            self.use_vbo = bool(glGenBuffers)
+            self.vertices = ArrayBuffer(self._blades, self.use_vbo)
+            self.colors = ArrayBuffer(self._colors, self.use_vbo)
+        if not self.count:
+            return
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.vertices.source())
+        glColorPointer(3, GL_FLOAT, 0, self.colors.source())
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        glPushMatrix()
+        glTranslatef(0.0, self.ground, 0.0)
+        for g in range(self.groups):
+            start, stop = self.group_starts[g], self.group_starts[g + 1]
+            if start == stop:
+                continue
+            # Gentle wind: blade tips lean by up to `sway`, bases stay put
+            lean = math.sin(time * 1.5 + g * 2 * math.pi / self.groups) * self.sway / self.mean_height
+            glPushMatrix()
+            glMultMatrixf((1.0, 0.0, 0.0, 0.0,
+                           lean, 1.0, 0.0, 0.0,
+                           0.0, 0.0, 1.0, 0.0,
+                           0.0, 0.0, 0.0, 1.0))
+            glDrawArrays(GL_QUADS, int(start), int(stop - start))
+            glPopMatrix()
+        glPopMatrix()
+
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+# ----------------------------------------------------------------------
+# Clouds
+# ----------------------------------------------------------------------
+
+# One cloud: overlapping spheres (x, y, z offset, radius)
+CLOUD_PARTS = (
+    (0, 0, 0, 25),    # Center
+    (15, 5, 8, 20),   # Right
+    (-12, 3, -5, 22), # Left
+    (8, -6, 12, 18),  # Bottom-right
+    (-6, 8, -8, 19),  # Top-left
+    (20, -2, 15, 16), # Far right
+    (-18, 6, 10, 17), # Far left
+)
+CLOUD_COLOR = (0.95, 0.95, 1.0) # Slightly blue-tinted white
+IMPOSTOR_TEXTURE_SIZE = 64
+
+def cloud_drift(bases, time):
+    """Drifted positions and alphas of clouds with the given (n, 3) base positions"""
+    i = np.arange(len(bases))
+    drift = np.stack([np.sin(time + i * 0.8) * 30,
+                      np.cos(time * 0.3 + i) * 15,
+                      np.sin(time * 0.5 + i) * 20], axis=1)
+    alpha = 0.8 + 0.2 * np.sin(time * 1.5 + i)
+    return bases + drift, alpha
+
+def cloud_sprite(size=IMPOSTOR_TEXTURE_SIZE, parts=CLOUD_PARTS):
+    """RGBA texture of a cloud seen from the side: soft discs where the spheres are"""
+    extent = max(max(abs(x), abs(y)) + r for x, y, _, r in parts)
+    coords = (np.arange(size) + 0.5) / size * 2 - 1
+    px, py = np.meshgrid(coords * extent, coords * extent) # Row 0 is the bottom, as GL expects
+    alpha = np.zeros((size, size))
+    for x, y, _, r in parts:
+        d = np.sqrt((px - x) ** 2 + (py - y) ** 2) / r
+        alpha = np.maximum(alpha, np.clip(1.0 - d ** 2, 0.0, 1.0))
+    shade = 0.85 + 0.15 * (py / extent + 1) / 2 # Lighter on top
+    rgba = np.empty((size, size, 4), dtype=np.uint8)
+    rgba[..., :3] = (np.array(CLOUD_COLOR)[None, None] * shade[..., None] * 255).astype(np.uint8)
+    rgba[..., 3] = (alpha * 255).astype(np.uint8)
+    return rgba, extent
+
+class CloudLayer:
+    """Near clouds drawn from one cached mesh, distant ones as billboard impostors
+
+    The cloud mesh is tessellated once; each near cloud is then a translate
+    and one draw call. All impostors (textured quads turned to the camera)
+    go in a single draw call, so hundreds of them cost about as much as one
+    mesh cloud.
+    """
+
+    def __init__(self, near, far_count=0, center=(0.0, 0.0), far_radius=(900.0, 1600.0),
+                 far_height=(220.0, 420.0), far_scale=(1.5, 3.0), seed=7):
+        self.near = np.asarray(near, dtype=np.float32).reshape(-1, 3)
+        self.use_vbo = None
+
+        # The mesh: every sphere of CLOUD_PARTS, tessellated like glutSolidSphere(r, 12, 8)
+        sphere = sphere_triangles(12, 8)
+        self._mesh = np.concatenate([sphere * r + (x, y, z) for x, y, z, r in CLOUD_PARTS])
+        self._mesh_normals = np.tile(sphere, (len(CLOUD_PARTS), 1))
+
+        # Impostors: a ring of distant clouds around `center`
+        rng = np.random.default_rng(seed)
+        angle = rng.uniform(0, 2 * np.pi, far_count)
+        radius = rng.uniform(*far_radius, far_count)
+        self.far = np.stack([center[0] + radius * np.cos(angle), rng.uniform(*far_height, far_count),
+                             center[1] + radius * np.sin(angle)], axis=1).astype(np.float32)
+        self.far_scale = rng.uniform(*far_scale, far_count).astype(np.float32)
+        self.sprite, self.sprite_extent = cloud_sprite()
+        corners = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)], dtype=np.float32)
+        self._corners = corners
+        self._texcoords = np.tile((corners + 1) / 2, (far_count, 1))
+
+    def _upload(self):
+        self.use_vbo = bool(glGenBuffers)
+        self.mesh = ArrayBuffer(self._mesh, self.use_vbo)
+        self.mesh_normals = ArrayBuffer(self._mesh_normals, self.use_vbo)
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        size = self.sprite.shape[0]
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, size, size, 0, GL_RGBA, GL_UNSIGNED_BYTE, self.sprite)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def draw(self, time):
+        """Draw every cloud at animation `time` (lighting and blending are up to the caller)"""
+        if self.use_vbo is None:
+            self._upload()
+
+        # Near clouds: the cached mesh at each drifted position
+        positions, alphas = cloud_drift(self.near, time)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.mesh.source())
+        glNormalPointer(GL_FLOAT, 0, self.mesh_normals.source())
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        for (x, y, z), alpha in zip(positions.tolist(), alphas.tolist()):
+            glPushMatrix()
+            glTranslatef(x, y, z)
+            glColor4f(*CLOUD_COLOR, alpha)
+            glDrawArrays(GL_TRIANGLES, 0, len(self.mesh))
+            glPopMatrix()
+        glDisableClientState(GL_NORMAL_ARRAY)
+
+        if len(self.far):
+            self._draw_impostors(time)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def _draw_impostors(self, time):
+        # Camera right/up in world space are the first two rows of the modelview rotation
+        view = np.asarray(glGetFloatv(GL_MODELVIEW_MATRIX), dtype=np.float32).reshape(4, 4)
+        right, up = view[:3, 0], view[:3, 1]
+
+        positions, alphas = cloud_drift(self.far, time)
+        half = (self.far_scale * self.sprite_extent)[:, None, None]
+        corners = positions[:, None] + half * (self._corners[:, 0, None] * right + self._corners[:, 1, None] * up)
+        colors = np.empty((len(self.far), 4, 4), dtype=np.float32)
+        colors[..., :3] = CLOUD_COLOR
+        colors[..., 3] = alphas[:, None]
+
+        glDisable(GL_LIGHTING) # Sprites carry their own shading
+        glDepthMask(GL_FALSE) # Overlapping translucent sprites must not hide each other
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(corners.reshape(-1, 3), dtype=np.float32))
+        glColorPointer(4, GL_FLOAT, 0, colors.reshape(-1, 4))
+        glTexCoordPointer(2, GL_FLOAT, 0, self._texcoords)
+        glDrawArrays(GL_QUADS, 0, len(self.far) * 4)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+        glDepthMask(GL_TRUE)
+        glEnable(GL_LIGHTING)
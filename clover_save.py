@@ -0,0 +1,251 @@
+"""
+
+Clover: Minesweeper 3D - Save Snapshots
+
+Compact binary snapshots of a board or a whole game:
+
+    header    magic, version, flags, width, height, depth, metadata length
+    metadata  JSON: game state, RNG states, layer destruction ages
+    planes    has_mine / revealed / flagged bit-packed, each layer padded to
+              whole bytes so one layer can be unpacked on its own
+    adjacency two counts per byte when they fit in 4 bits (otherwise recomputed on load)
+
+Snapshots are opened memory-mapped, so only the layers actually loaded are
+read and unpacked.
+
+"""
+
+import base64
+import json
+import struct
+import time
+
+import numpy as np
+
+from clover_board import Board, count_adjacent_mines
+
+SAVE_MAGIC = b"CLVS"
+SAVE_VERSION = 1
+HEADER = struct.Struct("<4sHHIIII") # magic, version, flags, width, height, depth, metadata bytes
+ALIGN = 64 # Planes start on a 64 byte boundary
+
+# Header flags
+FLAG_ADJACENCY = 1 # Nibble-packed adjacency counts follow the planes
+FLAG_ACROSS_LAYERS = 2 # Board uses 26-neighbourhood adjacency
+
+PLANES = ("has_mine", "revealed", "flagged")
+
+class SnapshotError(ValueError):
+    """File is not a (supported) Clover snapshot"""
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+def _pack_nibbles(counts):
+    """uint8 counts 0..15 (one layer, flattened) -> two per byte"""
+    if len(counts) % 2:
+        counts = np.append(counts, np.uint8(0))
+    return counts[0::2] | (counts[1::2] << 4)
+
+def _unpack_nibbles(packed, count):
+    counts = np.empty(len(packed) * 2, dtype=np.uint8)
+    counts[0::2] = packed & 0x0F
+    counts[1::2] = packed >> 4
+    return counts[:count]
+
+# ----------------------------------------------------------------------
+# Boards
+# ----------------------------------------------------------------------
+
+def save_board(board, path, metadata=None, adjacency=True):
+    """Write a board (plus optional JSON-able metadata) to `path`
+
+    Adjacency counts are stored nibble-packed when every count fits in 4 bits
+    (loading is then ~4x faster); with adjacency=False, or counts over 15
+    across layers, they are recomputed on load instead.
+    """
+    cells = board.width * board.height
+    if adjacency and board.adjacent_mines.max(initial=0) > 15:
+        adjacency = False
+
+    flags = (FLAG_ADJACENCY if adjacency else 0) | (FLAG_ACROSS_LAYERS if board.across_layers else 0)
+    meta = json.dumps(metadata or {}, separators=(",", ":")).encode()
+    header = HEADER.pack(SAVE_MAGIC, SAVE_VERSION, flags, board.width, board.height, board.depth, len(meta))
+
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(meta)
+        f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+        for name in PLANES:
+            plane = getattr(board, name).reshape(board.depth, cells)
+            f.write(np.packbits(plane, axis=1, bitorder='little').tobytes())
+        if adjacency:
+            for z in range(board.depth):
+                f.write(_pack_nibbles(board.adjacent_mines[z].reshape(-1)).tobytes())
+
+class Snapshot:
+    """A snapshot file opened memory-mapped; layers are unpacked on demand"""
+
+    def __init__(self, path):
+        self.path = path
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(data) < HEADER.size:
+            raise SnapshotError(f"{path}: too short for a snapshot")
+        magic, version, flags, width, height, depth, meta_size = HEADER.unpack(data[:HEADER.size].tobytes())
+        if magic != SAVE_MAGIC:
+            raise SnapshotError(f"{path}: not a Clover snapshot")
+        if version != SAVE_VERSION:
+            raise SnapshotError(f"{path}: unsupported snapshot version {version}")
+
+        self.width, self.height, self.depth = width, height, depth
+        self.has_adjacency = bool(flags & FLAG_ADJACENCY)
+        self.across_layers = bool(flags & FLAG_ACROSS_LAYERS)
+        self.metadata = json.loads(data[HEADER.size:HEADER.size + meta_size].tobytes())
+
+        # Views into the mapping - nothing below is read until a layer is unpacked
+        cells = width * height
+        self._layer_bytes = -(-cells // 8)
+        offset = _aligned(HEADER.size + meta_size)
+        self._planes = {}
+        for name in PLANES:
+            size = depth * self._layer_bytes
+            self._planes[name] = data[offset:offset + size].reshape(depth, self._layer_bytes)
+            offset += size
+        if self.has_adjacency:
+            nibble_bytes = -(-cells // 2)
+            self._adjacency = data[offset:offset + depth * nibble_bytes].reshape(depth, nibble_bytes)
+            offset += depth * nibble_bytes
+        if len(data) < offset:
+            raise SnapshotError(f"{path}: truncated snapshot")
+
+    def plane(self, name, z):
+        """One (height, width) bool layer of a plane"""
+        bits = np.unpackbits(self._planes[name][z], count=self.width * self.height, bitorder='little')
+        return bits.view(bool).reshape(self.height, self.width)
+
+    def board(self, layers=None, spacing=60, epoch=0.0):
+        """Unpack the given layers (all by default) into a new Board"""
+        layers = range(self.depth) if layers is None else list(layers)
+        board = Board(self.width, self.height, len(layers), spacing, epoch, self.across_layers)
+        for i, z in enumerate(layers):
+            for name in PLANES:
+                getattr(board, name)[i] = self.plane(name, z)
+            if self.has_adjacency:
+                board.adjacent_mines[i] = _unpack_nibbles(self._adjacency[z], self.width * self.height).reshape(
+                    self.height, self.width)
+
+        if not self.has_adjacency:
+            if self.across_layers and len(layers) != self.depth:
+                # Counts depend on the neighbouring layers too
+                lo, hi = min(layers), max(layers) + 1
+                lo, hi = max(lo - 1, 0), min(hi + 1, self.depth)
+                mines = np.stack([self.plane("has_mine", z) for z in range(lo, hi)])
+                counts = count_adjacent_mines(mines, True)
+                board.adjacent_mines[...] = counts[[z - lo for z in layers]]
+            else:
+                board.calculate_adjacent_mines()
+        return board
+
+def load_board(path, layers=None, spacing=60, epoch=0.0):
+    return Snapshot(path).board(layers, spacing, epoch)
+
+# ----------------------------------------------------------------------
+# Games
+# ----------------------------------------------------------------------
+
+# Game attributes saved as-is
+GAME_CONFIG = ("width", "height", "mine_percentage", "total_layers", "max_scanner_uses",
+               "base_time_limit", "cube_spacing", "seed", "no_guess", "no_guess_budget",
+               "player", "adaptive", "undo_limit")
+GAME_STATE = ("current_layer", "score", "game_over", "won", "level_complete", "scanner_uses",
+              "mines_count", "flags_count", "safe_cubes_revealed", "total_safe_cubes",
+              "mines_revealed", "mini_game_active", "mini_game_problem_index", "mini_game_answer",
+              "mini_game_input", "mini_game_time_limit")
+
+def game_config(game):
+    """JSON-able configuration a Game was created with (see game_from_config)"""
+    return {name: getattr(game, name) for name in GAME_CONFIG}
+
+def game_from_config(config, **options):
+    """New Game with a saved configuration; `options` are passed through (clock, log, board, ...)"""
+    from clover_engine import Game
+
+    return Game(config["width"], config["height"], config["mine_percentage"], config["total_layers"],
+                config["max_scanner_uses"], config["base_time_limit"], config["cube_spacing"],
+                seed=config["seed"], no_guess=config["no_guess"], no_guess_budget=config["no_guess_budget"],
+                player=config["player"], adaptive=config["adaptive"],
+                undo_limit=config.get("undo_limit", 100), **options)
+
+def _cube_coords(cube):
+    return [cube.grid_x, cube.grid_y, cube.grid_z] if cube else None
+
+def save_game(game, path, adjacency=True):
+    """Snapshot a Game to `path`; timers are stored relative to now"""
+    now = game.clock()
+    board = game.grid
+    deck = game.problem_deck
+
+    metadata = {
+        "config": game_config(game),
+        "state": {name: getattr(game, name) for name in GAME_STATE},
+        "selected": _cube_coords(game.selected_cube),
+        "mini_game_cube": _cube_coords(game.mini_game_cube),
+        # Seconds since (animation, mini-game) / until (layer change) each timer
+        "congrats_age": now - game.congrats_animation_start if game.congrats_animation_start else None,
+        "next_layer_in": game.next_layer_at - now if game.next_layer_at else None,
+        "mini_game_age": now - game.mini_game_start_time if game.mini_game_active else None,
+        "destruction_age": [now - board.epoch - float(board.destruction_offset[z].max())
+                            if board.destruction_offset[z].any() else None for z in range(board.depth)],
+        "mine_rng": game.mine_rng_state,
+        "problem_rng": deck.rng.getstate(),
+        "problem_cycles": deck.cycles,
+        # Named players keep their used problems in their own file
+        "used_problems": None if game.player else base64.b64encode(deck.used.bits.tobytes()).decode(),
+        "responses": game.responses.records(),
+    }
+    save_board(board, path, metadata, adjacency)
+
+def load_game(path, clock=time.time, log=None, problem_dir=None, **options):
+    """Recreate a Game saved with save_game; `options` are passed through (pregenerate, ...)"""
+    snapshot = Snapshot(path)
+    meta = snapshot.metadata
+    if "config" not in meta:
+        raise SnapshotError(f"{path}: board snapshot, not a saved game")
+    config = meta["config"]
+    now = clock()
+
+    # Board: destruction animations keep their age
+    ages = meta["destruction_age"]
+    oldest = max((age for age in ages if age is not None), default=0.0)
+    board = snapshot.board(spacing=config["cube_spacing"], epoch=now - oldest)
+    for z, age in enumerate(ages):
+        if age is not None:
+            board.start_destruction(now - age, z)
+
+    game = game_from_config(config, clock=clock, log=log, problem_dir=problem_dir, board=board, **options)
+
+    for name, value in meta["state"].items():
+        setattr(game, name, value)
+    board.mines_revealed = game.mines_revealed
+    game.selected_cube = game.cube_at(*meta["selected"][:2]) if meta["selected"] else None
+    game.mini_game_cube = board.cube(*meta["mini_game_cube"]) if meta["mini_game_cube"] else None
+    game.congrats_animation_start = now - meta["congrats_age"] if meta["congrats_age"] is not None else 0
+    game.next_layer_at = now + meta["next_layer_in"] if meta["next_layer_in"] is not None else 0
+    if meta["mini_game_age"] is not None:
+        game.mini_game_start_time = now - meta["mini_game_age"]
+    game.schedule_timers()
+
+    # Generators and problem history
+    game.restore_mine_rng(meta["mine_rng"])
+    deck = game.problem_deck
+    version, internal, gauss = meta["problem_rng"]
+    deck.rng.setstate((version, tuple(internal), gauss))
+    deck.cycles = meta["problem_cycles"]
+    if meta["used_problems"] is not None:
+        deck.used.bits[:] = np.frombuffer(base64.b64decode(meta["used_problems"]), dtype=np.uint8)
+        deck.shuffle()
+
+    saved = meta["responses"]
+    for record in zip(saved["latency"], saved["correct"], saved["operator"], saved["level"], saved["timed_out"]):
+        game.responses.record(*record)
+    return game
@@ -0,0 +1,86 @@
+"""
+
+Clover: Minesweeper 3D - Timed Events
+
+A priority queue of callbacks due at given times (mini-game timeouts, layer
+transitions, animation ends). The game advances it to "now" before each
+input and from the frontend's idle loop; checking for due events costs one
+heap peek, so nothing has to be polled per frame or per cube.
+
+"""
+
+import heapq
+import itertools
+
+class Event:
+    """A scheduled callback; cancel() keeps it from running"""
+
+    __slots__ = ("at", "seq", "name", "callback", "args", "cancelled")
+
+    def __init__(self, at, seq, name, callback, args):
+        self.at = at
+        self.seq = seq # Events due at the same time run in scheduling order
+        self.name = name
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.at, self.seq) < (other.at, other.seq)
+
+    def __repr__(self):
+        state = " cancelled" if self.cancelled else ""
+        return f"<Event {self.name} at {self.at:.3f}{state}>"
+
+    def cancel(self):
+        self.cancelled = True
+
+class Scheduler:
+    """Min-heap of Events, run in time order by advance(now)"""
+
+    def __init__(self):
+        self._queue = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return sum(not event.cancelled for event in self._queue)
+
+    def schedule(self, at, name, callback, *args):
+        """Run callback(at, *args) once the scheduler is advanced to `at`; returns the Event"""
+        event = Event(at, next(self._seq), name, callback, args)
+        heapq.heappush(self._queue, event)
+        return event
+
+    def clear(self):
+        for event in self._queue:
+            event.cancelled = True
+        self._queue.clear()
+
+    def _prune(self):
+        # Cancelled events are dropped lazily, when they reach the front
+        queue = self._queue
+        while queue and queue[0].cancelled:
+            heapq.heappop(queue)
+
+    @property
+    def next_time(self):
+        """When the earliest pending event is due (None if there is none)"""
+        self._prune()
+        return self._queue[0].at if self._queue else None
+
+    def due(self, now):
+        next_time = self.next_time
+        return next_time is not None and next_time <= now
+
+    def advance(self, now):
+        """Run every event due by `now`, earliest first; returns how many ran
+
+        Events scheduled by a callback run in the same call if they are due too.
+        """
+        ran = 0
+        while self.due(now):
+            event = heapq.heappop(self._queue)
+            event.cancelled = True # Done: cancelling it later is a no-op
+            event.callback(event.at, *event.args)
+            ran += 1
+        return ran
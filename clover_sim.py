@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+"""
+
+Clover: Minesweeper 3D - Batch Game Simulator
+
+Plays many complete games headlessly with the Game engine, spread over a
+process pool, to measure board fairness and scoring balance. Every game is
+reproducible from its seed.
+
+    python clover_sim.py --games 10000 --policy scanner --processes 4
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from functools import partial
+
+import numpy as np
+
+from clover_engine import Game, LEVEL_TRANSITION_DELAY
+from clover_solver import solve_board
+
+POLICY_STREAM = 1 # Policy RNG stream, kept apart from the engine's generators
+MOVE_TIME = 0.5 # Simulated seconds per board action
+
+class SimClock:
+    """Virtual time source so simulated games never wait on the wall clock"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+# ----------------------------------------------------------------------
+# Policies: policy(game, rng) performs exactly one board action
+# ----------------------------------------------------------------------
+
+def random_cell(game, rng):
+    """Random unrevealed, unflagged cube of the current layer"""
+    hidden = np.flatnonzero(~(game.grid.revealed[0] | game.grid.flagged[0]))
+    if len(hidden) == 0:
+        return None
+    return divmod(int(hidden[rng.integers(len(hidden))]), game.width)[::-1]
+
+def random_policy(game, rng):
+    """Reveal random cubes"""
+    cell = random_cell(game, rng)
+    if cell:
+        game.reveal(*cell)
+
+def scanner_policy(game, rng):
+    """Spend scanner charges on random cubes first, then reveal randomly"""
+    cell = random_cell(game, rng)
+    if not cell:
+        return
+    if game.scanner_uses > 0:
+        game.scan(*cell)
+    else:
+        game.reveal(*cell)
+
+def solver_policy(game, rng):
+    """Reveal a cube the solver proves safe, else the least likely mine"""
+    if not game.grid.revealed[0].any():
+        # Open on the center cube (always safe on no-guess boards)
+        game.reveal(game.width // 2, game.height // 2)
+        return
+    result = solve_board(game.grid)
+    safe = result.safe_cells()
+    if safe:
+        game.reveal(*safe[rng.integers(len(safe))])
+        return
+    cell = result.best_guess(~(game.grid.revealed[0] | game.grid.flagged[0]))
+    if cell:
+        game.reveal(*cell)
+
+POLICIES = {
+    "random": random_policy,
+    "scanner": scanner_policy,
+    "solver": solver_policy,
+}
+
+# ----------------------------------------------------------------------
+# Single game
+# ----------------------------------------------------------------------
+
+def play_game(seed, policy="random", accuracy=0.9, think_time=(1.0, 7.0),
+              width=10, height=10, mine_percentage=0.15, total_layers=5,
+              no_guess=False, adaptive=False, max_actions=100000):
+    """Play one complete game and return its result as a dict
+
+    The mini-game is answered correctly with probability `accuracy`, after a
+    uniformly random think time (which can run past the time limit).
+    """
+    clock = SimClock()
+    game = Game(width, height, mine_percentage, total_layers, seed=seed, clock=clock, no_guess=no_guess,
+                adaptive=adaptive)
+    rng = np.random.default_rng((seed, POLICY_STREAM))
+    choose = POLICIES[policy]
+
+    actions = mines_hit = mines_defused = timeouts = 0
+    while not game.game_over and actions < max_actions:
+        if game.mini_game_active:
+            # Answer the mine's problem (or run out of time)
+            mines_hit += 1
+            clock.advance(rng.uniform(*think_time))
+            game.step()
+            if not game.mini_game_active:
+                timeouts += 1
+            elif rng.random() < accuracy:
+                mines_defused += game.answer(str(game.mini_game_answer))
+            else:
+                game.answer(str(game.mini_game_answer + 1))
+        elif game.level_complete:
+            clock.advance(LEVEL_TRANSITION_DELAY)
+            game.step()
+        else:
+            actions += 1
+            clock.advance(MOVE_TIME)
+            choose(game, rng)
+            game.step()
+
+    return {
+        "seed": seed,
+        "won": game.won,
+        "score": game.score,
+        "layers_cleared": game.current_layer if not game.won else game.total_layers,
+        "mines_hit": mines_hit,
+        "mines_defused": mines_defused,
+        "timeouts": timeouts,
+        "actions": actions,
+        "sim_time": clock.now,
+        "response_p50": game.responses.percentiles((50,))[50],
+        "time_limit": game.mini_game_time_limit,
+    }
+
+# ----------------------------------------------------------------------
+# Batches
+# ----------------------------------------------------------------------
+
+def simulate(games, seed=0, processes=None, chunksize=None, **game_options):
+    """Play `games` seeded games (seed, seed + 1, ...) and yield results as they finish
+
+    With processes=1 everything runs in this process; otherwise a
+    multiprocessing pool is used (all cores by default). Results arrive in
+    completion order, each carrying its seed.
+    """
+    seeds = range(seed, seed + games)
+    play = partial(play_game, **game_options)
+
+    if processes == 1:
+        yield from map(play, seeds)
+        return
+
+    processes = processes or multiprocessing.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, min(256, games // (processes * 8)))
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(play, seeds, chunksize)
+
+def summarize(results):
+    """Aggregate fairness/scoring numbers from a list of results"""
+    scores = np.array([r["score"] for r in results])
+    layers = np.array([r["layers_cleared"] for r in results])
+    return {
+        "games": len(results),
+        "win_rate": float(np.mean([r["won"] for r in results])) if results else 0.0,
+        "score_mean": float(scores.mean()) if results else 0.0,
+        "score_p50": float(np.percentile(scores, 50)) if results else 0.0,
+        "score_p90": float(np.percentile(scores, 90)) if results else 0.0,
+        "layers_mean": float(layers.mean()) if results else 0.0,
+        "mines_hit_mean": float(np.mean([r["mines_hit"] for r in results])) if results else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seeded Clover games headlessly")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="First game seed")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--accuracy", type=float, default=0.9, help="Chance of answering a problem correctly")
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--height", type=int, default=10)
+    parser.add_argument("--mines", type=float, default=0.15, help="Mine percentage")
+    parser.add_argument("--layers", type=int, default=5)
+    parser.add_argument("--no-guess", action="store_true", help="Generate boards that never need a guess")
+    parser.add_argument("--adaptive", action="store_true", help="Adapt the mini-game time limit and difficulty")
+    parser.add_argument("--jsonl", help="Stream per-game results to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    options = dict(policy=args.policy, accuracy=args.accuracy, width=args.width,
+                   height=args.height, mine_percentage=args.mines, total_layers=args.layers,
+                   no_guess=args.no_guess, adaptive=args.adaptive)
+
+    out = None
+    if args.jsonl:
+        out = sys.stdout if args.jsonl == "-" else open(args.jsonl, "w")
+
+    results = []
+    start = last_report = time.perf_counter()
+    for result in simulate(args.games, args.seed, args.processes, **options):
+        results.append(result)
+        if out:
+            out.write(json.dumps(result) + "\n")
+
+        now = time.perf_counter()
+        if now - last_report >= 1.0:
+            last_report = now
+            print(f"⏱️ {len(results)}/{args.games} games, {len(results) / (now - start):.1f} games/s",
+                  file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    if out and out is not sys.stdout:
+        out.close()
+
+    summary = summarize(results)
+    summary["seconds"] = elapsed
+    summary["games_per_second"] = len(results) / elapsed if elapsed > 0 else 0.0
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return summary
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,577 @@
+"""
+
+Clover: Minesweeper 3D - Board Solver
+
+Reads the revealed numbers of a layer and works out which hidden cubes are
+certainly safe, which are certainly mines, and the mine probability of every
+other hidden cube.
+
+Each revealed number becomes a constraint "these hidden neighbours hold N
+mines", stored as an integer bitmask over the frontier cubes. The solver
+propagates trivial and subset deductions, splits the remaining constraints
+into independent components, enumerates small components exactly and
+approximates large ones, then weights everything by the number of mines left.
+
+"""
+
+import math
+import time
+
+import numpy as np
+
+from clover_board import count_adjacent_mines
+
+EXACT_LIMIT = 28 # Largest component (in cubes) that is enumerated exactly
+NODE_BUDGET = 200000 # Search nodes per component before falling back to approximation
+SUBSET_ROUNDS = 8 # Rounds of subset deduction before giving up on new constraints
+
+class SolverResult:
+    """Solver output for one layer, as (height, width) arrays"""
+
+    def __init__(self, safe, mines, probability, exact):
+        self.safe = safe                # Hidden cubes that are certainly safe
+        self.mines = mines              # Hidden cubes that are certainly mines
+        self.probability = probability  # Mine probability of hidden cubes (0 for revealed ones)
+        self.exact = exact              # False if any component was approximated
+
+    def safe_cells(self):
+        ys, xs = np.nonzero(self.safe)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def mine_cells(self):
+        ys, xs = np.nonzero(self.mines)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def best_guess(self, hidden):
+        """(x, y) of the hidden cube least likely to be a mine, or None"""
+        if not hidden.any():
+            return None
+        probability = np.where(hidden, self.probability, np.inf)
+        y, x = np.unravel_index(int(np.argmin(probability)), probability.shape)
+        return int(x), int(y)
+
+class _SearchBudgetExceeded(Exception):
+    pass
+
+def _popcount(mask):
+    return bin(mask).count("1")
+
+def _bits(mask):
+    """Indices of the set bits of an int"""
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low.bit_length() - 1)
+        mask ^= low
+    return bits
+
+# ----------------------------------------------------------------------
+# Constraint building and propagation
+# ----------------------------------------------------------------------
+
+def _build_constraints(revealed, adjacent_mines, known_mines):
+    """Frontier variable ids and {bitmask: mines} constraints for one layer"""
+    height, width = revealed.shape
+    unknown = ~revealed & ~known_mines
+
+    # Revealed numbers that still touch hidden cubes
+    unknown_around = count_adjacent_mines(unknown[None])[0]
+    mines_around = count_adjacent_mines(known_mines[None])[0]
+    constraint_cells = revealed & ~known_mines & (unknown_around > 0)
+
+    # Frontier = hidden cubes next to at least one such number
+    frontier = unknown & (count_adjacent_mines(constraint_cells[None])[0] > 0)
+
+    var_id = np.full((height + 2, width + 2), -1, dtype=np.int64)
+    fy, fx = np.nonzero(frontier)
+    var_id[fy + 1, fx + 1] = np.arange(len(fy))
+
+    # Neighbour variable ids of every constraint cell, gathered in one go
+    cy, cx = np.nonzero(constraint_cells)
+    neighbour_ids = np.stack([var_id[cy + 1 + dy, cx + 1 + dx]
+                              for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                              if (dy, dx) != (0, 0)], axis=1)
+    need = adjacent_mines[cy, cx].astype(np.int64) - mines_around[cy, cx]
+
+    constraints = {}
+    for ids, count in zip(neighbour_ids.tolist(), need.tolist()):
+        mask = 0
+        for v in ids:
+            if v >= 0:
+                mask |= 1 << v
+        if mask:
+            constraints[mask] = count
+    return (fy, fx), constraints
+
+def _propagate(constraints, safe_mask=0, mine_mask=0):
+    """Apply trivial and subset deductions until nothing changes
+
+    Returns (constraints, safe_mask, mine_mask) with known cubes removed
+    from every constraint.
+    """
+    rounds = 0
+    while True:
+        # Remove known cubes from every constraint
+        known = safe_mask | mine_mask
+        reduced = {}
+        for mask, count in constraints.items():
+            if mask & known:
+                count -= _popcount(mask & mine_mask)
+                mask &= ~known
+            if mask:
+                reduced[mask] = count
+        constraints = reduced
+
+        # Trivial: no mines left -> all safe, as many mines as cubes -> all mines
+        found = False
+        for mask, count in constraints.items():
+            if count <= 0:
+                safe_mask |= mask
+                found = True
+            elif count >= _popcount(mask):
+                mine_mask |= mask
+                found = True
+        if found:
+            continue
+
+        # Subset rule: A inside B means B - A holds count(B) - count(A) mines
+        if rounds >= SUBSET_ROUNDS:
+            break
+        rounds += 1
+
+        by_var = {}
+        for mask in constraints:
+            for v in _bits(mask):
+                by_var.setdefault(v, []).append(mask)
+
+        derived = {}
+        for a, count_a in constraints.items():
+            partners = set()
+            for v in _bits(a):
+                partners.update(by_var[v])
+            for b in partners:
+                if b != a and a & b == a:
+                    difference = b & ~a
+                    if difference not in constraints and difference not in derived:
+                        derived[difference] = constraints[b] - count_a
+        if not derived:
+            break
+        constraints.update(derived)
+
+    return constraints, safe_mask, mine_mask
+
+def _components(constraints):
+    """Split constraints into groups that share no cubes"""
+    parent = {}
+
+    def find(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    for mask in constraints:
+        bits = _bits(mask)
+        for v in bits:
+            parent.setdefault(v, v)
+        root = find(bits[0])
+        for v in bits[1:]:
+            other = find(v)
+            if other != root:
+                parent[other] = root
+
+    groups = {}
+    for mask, count in constraints.items():
+        groups.setdefault(find(_bits(mask)[0]), {})[mask] = count
+    return list(groups.values())
+
+# ----------------------------------------------------------------------
+# Component solving
+# ----------------------------------------------------------------------
+
+def _enumerate(variables, constraints, node_budget):
+    """Exact enumeration of one component
+
+    Returns {mines_in_component: (solution_count, per_variable_mine_counts)}.
+    """
+    local = {v: i for i, v in enumerate(variables)}
+    cons_vars = [[local[v] for v in _bits(mask)] for mask in constraints]
+    need = list(constraints.values())
+    left = [len(vs) for vs in cons_vars]
+
+    cons_of_var = [[] for _ in variables]
+    for ci, vs in enumerate(cons_vars):
+        for i in vs:
+            cons_of_var[i].append(ci)
+
+    n = len(variables)
+    totals = {}
+    assignment = [0] * n
+    nodes = [0]
+
+    def search(i, k):
+        nodes[0] += 1
+        if nodes[0] > node_budget:
+            raise _SearchBudgetExceeded
+        if i == n:
+            entry = totals.get(k)
+            if entry is None:
+                entry = totals[k] = [0, [0] * n]
+            entry[0] += 1
+            counts = entry[1]
+            for j in range(n):
+                if assignment[j]:
+                    counts[j] += 1
+            return
+
+        touched = cons_of_var[i]
+        for value in (0, 1):
+            ok = True
+            for ci in touched:
+                left[ci] -= 1
+                need[ci] -= value
+                if need[ci] < 0 or need[ci] > left[ci]:
+                    ok = False
+            if ok:
+                assignment[i] = value
+                search(i + 1, k + value)
+            for ci in touched:
+                left[ci] += 1
+                need[ci] += value
+        assignment[i] = 0
+
+    search(0, 0)
+    return totals
+
+def _order_variables(constraints):
+    """Order a component's cubes so neighbouring cubes are assigned together"""
+    by_var = {}
+    for mask in constraints:
+        for v in _bits(mask):
+            by_var.setdefault(v, []).append(mask)
+
+    order = []
+    seen = set()
+    for start in sorted(by_var):
+        if start in seen:
+            continue
+        queue = [start]
+        seen.add(start)
+        while queue:
+            v = queue.pop(0)
+            order.append(v)
+            for mask in by_var[v]:
+                for w in _bits(mask):
+                    if w not in seen:
+                        seen.add(w)
+                        queue.append(w)
+    return order
+
+def _approximate(constraints):
+    """Per-cube mine probability from the average density of its constraints"""
+    sums = {}
+    for mask, count in constraints.items():
+        bits = _bits(mask)
+        density = min(max(count / len(bits), 0.0), 1.0)
+        for v in bits:
+            total, seen = sums.get(v, (0.0, 0))
+            sums[v] = (total + density, seen + 1)
+    return {v: total / seen for v, (total, seen) in sums.items()}
+
+def _log_comb(n, k):
+    if k < 0 or k > n:
+        return -math.inf
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+def _convolve(a, b):
+    return np.convolve(a, b) if len(a) and len(b) else np.zeros(1)
+
+# ----------------------------------------------------------------------
+# Public API
+# ----------------------------------------------------------------------
+
+def solve(revealed, adjacent_mines, total_mines=None, known_mines=None, density=0.15,
+          exact_limit=EXACT_LIMIT, node_budget=NODE_BUDGET):
+    """Solve one layer from its revealed numbers
+
+    revealed / adjacent_mines / known_mines are (height, width) arrays;
+    known_mines marks hidden cubes already known to be mines. total_mines is
+    the number of mines left on the layer, known ones included. Without it,
+    hidden cubes away from the frontier get `density` as their probability.
+    """
+    revealed = np.asarray(revealed, dtype=bool)
+    if known_mines is None:
+        known_mines = np.zeros_like(revealed)
+    known_mines = np.asarray(known_mines, dtype=bool)
+    height, width = revealed.shape
+
+    (fy, fx), constraints = _build_constraints(revealed, adjacent_mines, known_mines)
+    constraints, safe_mask, mine_mask = _propagate(constraints)
+
+    variable_count = len(fy)
+    probability = np.zeros(variable_count)
+    for v in _bits(mine_mask):
+        probability[v] = 1.0
+
+    # Solve each independent component
+    exact = True
+    exact_parts = []    # (variables, {k: (solutions, per-variable counts)})
+    approx_mines = 0.0
+    for component in _components(constraints):
+        variables = _order_variables(component)
+        totals = None
+        if len(variables) <= exact_limit:
+            try:
+                totals = _enumerate(variables, component, node_budget)
+            except _SearchBudgetExceeded:
+                totals = None
+        if totals:
+            exact_parts.append((variables, totals))
+        else:
+            exact = False
+            for v, p in _approximate(component).items():
+                probability[v] = p
+                approx_mines += p
+
+    # Hidden cubes that no number touches
+    unknown = ~revealed & ~known_mines
+    other = unknown.copy()
+    other[fy, fx] = False
+    other_count = int(np.count_nonzero(other))
+
+    # Mines left for the exact components plus the untouched cubes
+    if total_mines is not None:
+        mines_left = total_mines - int(np.count_nonzero(known_mines & ~revealed))
+        mines_left -= _popcount(mine_mask) + int(round(approx_mines))
+    else:
+        mines_left = None
+
+    # Per-component mine-count distributions
+    distributions = []
+    for variables, totals in exact_parts:
+        dist = np.zeros(max(totals) + 1)
+        for k, (solutions, _) in totals.items():
+            dist[k] = solutions
+        distributions.append(dist / dist.max())
+
+    def outside_weight(k_total):
+        """Relative weight of the untouched cubes holding the remaining mines"""
+        if mines_left is None:
+            return k_total * math.log(density / (1 - density)) if 0 < density < 1 else 0.0
+        return _log_comb(other_count, mines_left - k_total)
+
+    # Prefix/suffix convolutions so each component can be weighted by all the others
+    prefix = [np.ones(1)]
+    for dist in distributions:
+        prefix.append(_convolve(prefix[-1], dist))
+    suffix = [np.ones(1)]
+    for dist in reversed(distributions):
+        suffix.append(_convolve(suffix[-1], dist))
+    suffix.reverse()
+
+    combined = prefix[-1]
+    log_weights = np.array([outside_weight(t) for t in range(len(combined))])
+    finite = np.isfinite(log_weights)
+    shift = log_weights[finite].max() if finite.any() else 0.0
+    weights = np.where(finite, np.exp(log_weights - shift), 0.0)
+    total_weight = float(np.dot(combined, weights))
+    if total_weight <= 0:
+        # Inconsistent mine total: fall back to ignoring it
+        mines_left = None
+        log_weights = np.array([outside_weight(t) for t in range(len(combined))])
+        weights = np.exp(log_weights - log_weights.max())
+        total_weight = float(np.dot(combined, weights))
+
+    for index, (variables, totals) in enumerate(exact_parts):
+        others = _convolve(prefix[index], suffix[index + 1])
+        # Weight of this component holding k mines, summed over the others
+        k_weights = {}
+        for k in totals:
+            w = 0.0
+            for j, count in enumerate(others):
+                if count and k + j < len(weights):
+                    w += count * weights[k + j]
+            k_weights[k] = w
+
+        scale = max(solutions for solutions, _ in totals.values())
+        norm = sum(totals[k][0] / scale * k_weights[k] for k in totals)
+        if norm <= 0:
+            continue
+        mine_weight = np.zeros(len(variables))
+        for k, (solutions, counts) in totals.items():
+            mine_weight += np.array(counts) / scale * k_weights[k]
+        for v, p in zip(variables, mine_weight / norm):
+            probability[v] = p
+
+    # Untouched cubes share whatever mines are expected to be left over
+    if other_count:
+        if mines_left is None:
+            other_probability = density
+        else:
+            expected = sum(combined[t] * weights[t] * (mines_left - t)
+                           for t in range(len(combined)))
+            other_probability = min(max(expected / total_weight / other_count, 0.0), 1.0)
+    else:
+        other_probability = 0.0
+
+    # Back to (height, width) arrays
+    result_probability = np.zeros((height, width))
+    result_probability[other] = other_probability
+    result_probability[fy, fx] = probability
+    result_probability[known_mines & ~revealed] = 1.0
+
+    safe = np.zeros((height, width), dtype=bool)
+    mines = np.zeros((height, width), dtype=bool)
+    safe_ids = _bits(safe_mask)
+    mine_ids = _bits(mine_mask)
+    safe[fy[safe_ids], fx[safe_ids]] = True
+    mines[fy[mine_ids], fx[mine_ids]] = True
+
+    # Exact components can still pin cubes down completely
+    if exact_parts:
+        ids = np.array([v for variables, _ in exact_parts for v in variables])
+        enumerated = np.zeros((height, width), dtype=bool)
+        enumerated[fy[ids], fx[ids]] = True
+        safe |= enumerated & (result_probability <= 1e-12)
+        mines |= enumerated & (result_probability >= 1 - 1e-12)
+    if other_count and mines_left is not None:
+        if other_probability <= 1e-12:
+            safe |= other
+        elif other_probability >= 1 - 1e-12:
+            mines |= other
+    result_probability[safe] = 0.0
+    result_probability[mines] = 1.0
+
+    return SolverResult(safe, mines, result_probability, exact)
+
+def solve_board(board, z=0, **options):
+    """Solve one layer of a Board using only what the player can see
+
+    The number of hidden mines is public (the "Mines" counter less defused
+    mines), and a mine that was just triggered is visible, so both are used.
+    """
+    revealed = board.revealed[z]
+    triggered = revealed & board.has_mine[z]
+    options.setdefault("total_mines", int(np.count_nonzero(board.has_mine[z])))
+    return solve(revealed & ~triggered, board.adjacent_mines[z], known_mines=triggered, **options)
+
+# ----------------------------------------------------------------------
+# No-guess board generation
+# ----------------------------------------------------------------------
+
+def _relocate_mines(board, z, x, y, rng, protected):
+    """Move mines next to a stuck guess to hidden cubes away from the revealed area
+
+    Returns the number of mines moved (0 if there was nowhere to put them).
+    """
+    revealed = board.revealed[z]
+    has_mine = board.has_mine[z]
+    hidden = ~revealed
+
+    # Mines to move: the guess and its neighbours, widening until some are found
+    window = np.zeros_like(hidden)
+    for radius in (1, 2, 3):
+        window[:] = False
+        window[max(y - radius, 0):y + radius + 1, max(x - radius, 0):x + radius + 1] = True
+        movers = np.flatnonzero(window & hidden & has_mine)
+        if len(movers):
+            break
+    else:
+        # Fall back to any mine on the frontier
+        touching = count_adjacent_mines(revealed[None])[0] > 0
+        movers = np.flatnonzero(touching & hidden & has_mine)[:1]
+
+    # Prefer destinations that don't change any revealed number
+    free = hidden & ~has_mine & ~window & ~protected
+    far = free & (count_adjacent_mines(revealed[None])[0] == 0)
+    targets = np.flatnonzero(far) if far.any() else np.flatnonzero(free)
+    if len(movers) == 0 or len(targets) < len(movers):
+        return 0
+
+    destinations = targets[rng.choice(len(targets), size=len(movers), replace=False)]
+    for source, target in zip(movers.tolist(), destinations.tolist()):
+        sy, sx = divmod(source, board.width)
+        ty, tx = divmod(target, board.width)
+        board.move_mine((sx, sy, z), (tx, ty, z))
+    return len(movers)
+
+def _clear_by_deduction(board, z, start, mines, rng, protected, stats, deadline):
+    """Play the layer from `start` using only deductions, relocating mines when stuck
+
+    Returns the number of relocations (0 means the board needs no guesses),
+    or None if the board couldn't be fixed (no room to move mines, or out of time).
+    """
+    board.revealed[z] = False
+    board.flood_reveal(start[0], start[1], z)
+    relocations = 0
+
+    while board.unrevealed_count(z) > mines:
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+
+        stats["solver_calls"] += 1
+        result = solve_board(board, z)
+        if result.safe.any():
+            for x, y in result.safe_cells():
+                board.flood_reveal(x, y, z)
+            continue
+
+        # Stuck: a player would have to guess here
+        guess = result.best_guess(~board.revealed[z])
+        moved = _relocate_mines(board, z, guess[0], guess[1], rng, protected)
+        if not moved:
+            return None
+        relocations += 1
+        stats["relocations"] += moved
+
+    return relocations
+
+def generate_no_guess(board, mines, start=None, rng=None, z=0, time_budget=None, max_restarts=20):
+    """Place `mines` mines on a layer so it can be cleared from `start` without guessing
+
+    The start cube and its neighbours are kept mine-free. The layer is then
+    played by the solver; whenever it would have to guess, the mines around
+    the guess are moved to hidden cubes elsewhere and solving continues from
+    where it was. A final pass with no relocations proves the board. Only if
+    mines can't be moved is the layer regenerated from scratch.
+
+    Returns stats: attempts (solver passes), restarts, relocations (mines
+    moved), solver_calls, seconds and no_guess (False if the time budget ran
+    out; the board is still valid but may need a guess).
+    """
+    if rng is None or isinstance(rng, (int, np.integer)):
+        rng = np.random.default_rng(rng)
+    if start is None:
+        start = (board.width // 2, board.height // 2)
+
+    began = time.perf_counter()
+    deadline = began + time_budget if time_budget is not None else None
+    stats = {"attempts": 0, "restarts": 0, "relocations": 0, "solver_calls": 0,
+             "seconds": 0.0, "no_guess": False}
+
+    _, y_slice, x_slice = board.neighbourhood(start[0], start[1], z)
+    protected = np.zeros((board.height, board.width), dtype=bool)
+    protected[y_slice, x_slice] = True
+    if mines > protected.size - np.count_nonzero(protected):
+        raise ValueError(f"Cannot place {mines} mines outside the start area")
+
+    for _ in range(max_restarts + 1):
+        board.place_mines(mines, rng, z=z, exclude=np.flatnonzero(protected))
+        board.calculate_adjacent_mines()
+
+        while True:
+            stats["attempts"] += 1
+            relocations = _clear_by_deduction(board, z, start, mines, rng, protected, stats, deadline)
+            if relocations is None or relocations == 0:
+                break
+
+        if relocations == 0:
+            stats["no_guess"] = True
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        stats["restarts"] += 1
+
+    board.revealed[z] = False
+    stats["seconds"] = time.perf_counter() - began
+    return stats
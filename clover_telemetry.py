@@ -0,0 +1,117 @@
+"""
+
+Clover: Minesweeper 3D - Mini-Game Telemetry
+
+Records how long players take to answer mini-game problems (and whether they
+got them right) in a fixed-size ring buffer, reports latency percentiles,
+and derives an adaptive time limit and difficulty offset from the recent
+answers, so the mini-game can be tuned from data.
+
+"""
+
+import numpy as np
+
+from clover_problems import OPERATORS
+
+RESPONSE_CAPACITY = 256 # Answers kept; older ones are overwritten
+
+# Adaptation (Game(adaptive=True))
+ADAPT_WINDOW = 20 # Recent answers the adaptation looks at
+ADAPT_MIN_SAMPLES = 5 # Below this the configured limit/tier are used unchanged
+ADAPT_MARGIN = 1.25 # Time limit = margin x p90 of recent response times
+ADAPT_LIMIT_RANGE = (0.6, 3.0) # Adapted limit stays within these multiples of the configured one
+EASIER_BELOW = 0.6 # Recent accuracy under this drops a difficulty level
+HARDER_ABOVE = 0.9 # ... at or over this (while answering quickly) adds one
+
+class ResponseLog:
+    """Ring buffer of mini-game answers: latency, correctness, operator, difficulty"""
+
+    def __init__(self, capacity=RESPONSE_CAPACITY):
+        self.capacity = capacity
+        self.latency = np.zeros(capacity, dtype=np.float32)
+        self.correct = np.zeros(capacity, dtype=bool)
+        self.timed_out = np.zeros(capacity, dtype=bool)
+        self.operator = np.zeros(capacity, dtype=np.int8)
+        self.level = np.zeros(capacity, dtype=np.int8)
+        self.total = 0 # Answers ever recorded
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def record(self, latency, correct, operator, level, timed_out=False):
+        i = self.total % self.capacity
+        self.latency[i] = latency
+        self.correct[i] = correct
+        self.timed_out[i] = timed_out
+        self.operator[i] = operator
+        self.level[i] = level
+        self.total += 1
+
+    def records(self, window=None):
+        """The last `window` answers (all kept ones by default), oldest first, as lists per field"""
+        positions = self._window(window)
+        return {name: getattr(self, name)[positions].tolist()
+                for name in ("latency", "correct", "timed_out", "operator", "level")}
+
+    def _window(self, window=None, operator=None):
+        """Buffer positions of the last `window` answers (all kept ones by default), oldest first"""
+        n = len(self) if window is None else min(window, len(self))
+        positions = (self.total - n + np.arange(n)) % self.capacity
+        if operator is not None:
+            positions = positions[self.operator[positions] == OPERATORS.index(operator)]
+        return positions
+
+    def percentiles(self, q=(50, 90, 99), window=None, operator=None):
+        """{percentile: seconds} of the response times (None when nothing was recorded)"""
+        positions = self._window(window, operator)
+        if len(positions) == 0:
+            return {p: None for p in q}
+        values = np.percentile(self.latency[positions], q)
+        return {p: float(v) for p, v in zip(q, values)}
+
+    def accuracy(self, window=None, operator=None):
+        positions = self._window(window, operator)
+        return float(self.correct[positions].mean()) if len(positions) else None
+
+    def summary(self, window=None):
+        """Counts, accuracy and latency percentiles, overall and per operator"""
+        positions = self._window(window)
+        stats = {
+            "answers": len(positions),
+            "accuracy": self.accuracy(window),
+            "timeouts": int(self.timed_out[positions].sum()),
+            "latency": self.percentiles(window=window),
+            "operators": {},
+        }
+        for op in OPERATORS:
+            count = len(self._window(window, op))
+            if count:
+                stats["operators"][op] = {
+                    "answers": count,
+                    "accuracy": self.accuracy(window, op),
+                    "latency": self.percentiles((50, 90), window, op),
+                }
+        return stats
+
+# ----------------------------------------------------------------------
+# Adaptation
+# ----------------------------------------------------------------------
+
+def adaptive_time_limit(log, base, window=ADAPT_WINDOW):
+    """Time limit that leaves room for ADAPT_MARGIN x the recent p90 response time"""
+    if min(len(log), window) < ADAPT_MIN_SAMPLES:
+        return base
+    p90 = log.percentiles((90,), window)[90]
+    low, high = ADAPT_LIMIT_RANGE
+    return float(np.clip(p90 * ADAPT_MARGIN, base * low, base * high))
+
+def tier_offset(log, time_limit, window=ADAPT_WINDOW):
+    """-1 (easier), 0 or +1 (harder) difficulty levels from recent accuracy and speed"""
+    if min(len(log), window) < ADAPT_MIN_SAMPLES:
+        return 0
+    accuracy = log.accuracy(window)
+    if accuracy < EASIER_BELOW:
+        return -1
+    if accuracy >= HARDER_ABOVE and log.percentiles((50,), window)[50] < time_limit / 2:
+        return 1
+    return 0
@@ -0,0 +1,246 @@
+"""
+
+Clover: Minesweeper 3D - Text Rendering
+
+UI text drawn from a glyph atlas instead of one glutBitmapCharacter call per
+character. The GLUT bitmap fonts are rasterized once into a single alpha
+texture, so text looks exactly as before. Each string becomes a run of
+textured quads, built once and cached while the same string is drawn again.
+All text of a UI pass is drawn with a single call, inside one orthographic
+setup.
+
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import *
+
+FIRST_CHAR, LAST_CHAR = 32, 126 # Printable ASCII; anything else is skipped, as GLUT does
+ATLAS_COLUMNS = 16
+STRING_CACHE_SIZE = 256 # Strings kept ready; changing ones (timers) just fall out
+PAD = 1 # Pixels left of the pen inside each cell, for glyphs that start before it
+
+# Line heights of the GLUT bitmap fonts (glutBitmapHeight is freeglut-only)
+FONT_HEIGHTS = {
+    GLUT_BITMAP_8_BY_13: 13,
+    GLUT_BITMAP_9_BY_15: 15,
+    GLUT_BITMAP_HELVETICA_10: 13,
+    GLUT_BITMAP_HELVETICA_12: 15,
+    GLUT_BITMAP_HELVETICA_18: 22,
+    GLUT_BITMAP_TIMES_ROMAN_10: 13,
+    GLUT_BITMAP_TIMES_ROMAN_24: 28,
+}
+
+class Glyphs:
+    """Where one font's characters are in the atlas"""
+
+    def __init__(self, advances, cell_width, cell_height, descent, top):
+        self.advances = advances # Pen advance per character code (FIRST_CHAR..LAST_CHAR)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.descent = descent # Cell rows below the baseline
+        self.top = top # First atlas row of this font
+
+class TextRenderer:
+    """Batched bitmap-font text for 2D overlays in window coordinates
+
+        text.begin()        # one orthographic setup for the pass
+        text.draw(10, 770, "Score: 12", GLUT_BITMAP_HELVETICA_18)
+        ...
+        text.end()          # every queued string in one draw call
+
+    Strings take the current GL color at draw() time, like glutBitmapCharacter.
+    """
+
+    def __init__(self, width=1200, height=800, fonts=tuple(FONT_HEIGHTS)):
+        self.width = width
+        self.height = height
+        self.fonts = fonts
+        self.texture = None
+        self.glyphs = {}
+        self.atlas_size = (0, 0)
+        self._strings = OrderedDict()
+        self._queue = []
+        self._batch_keys = None
+        self._batch = None
+
+    # ------------------------------------------------------------------
+    # Atlas
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Rasterize the fonts into the atlas, once
+
+        Needs a current GL context and draws into the back buffer, so call it
+        before the frame is cleared.
+        """
+        if self.texture is not None:
+            return
+        glPushAttrib(GL_ALL_ATTRIB_BITS)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_BLEND)
+        glDisable(GL_TEXTURE_2D)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        images = []
+        top = 0
+        for font in self.fonts:
+            image, glyphs = self._rasterize(font, top)
+            self.glyphs[font] = glyphs
+            images.append(image)
+            top += image.shape[0]
+
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glPopAttrib()
+
+        width = max(image.shape[1] for image in images)
+        atlas = np.zeros((top, width), dtype=np.uint8)
+        row = 0
+        for image in images:
+            atlas[row:row + image.shape[0], :image.shape[1]] = image
+            row += image.shape[0]
+        self.atlas_size = (width, top)
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST) # Pixel-exact, like the bitmaps
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, width, top, 0, GL_ALPHA, GL_UNSIGNED_BYTE, atlas)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def _rasterize(self, font, top):
+        """Draw every character of `font` in a grid and read it back as coverage"""
+        codes = range(FIRST_CHAR, LAST_CHAR + 1)
+        advances = np.zeros(LAST_CHAR + 1, dtype=np.int32)
+        for code in codes:
+            advances[code] = glutBitmapWidth(font, code)
+        height = FONT_HEIGHTS.get(font, 24)
+        cell_width, cell_height = int(advances.max()) + 2 * PAD + 2, height + 2
+        descent = height // 4 + 1
+        rows = -(-len(codes) // ATLAS_COLUMNS)
+        width, image_height = cell_width * ATLAS_COLUMNS, cell_height * rows
+
+        glViewport(0, 0, width, image_height)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluOrtho2D(0, width, 0, image_height)
+        glMatrixMode(GL_MODELVIEW)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glColor3f(1.0, 1.0, 1.0)
+        for i, code in enumerate(codes):
+            column, row = i % ATLAS_COLUMNS, i // ATLAS_COLUMNS
+            glRasterPos2i(column * cell_width + PAD, row * cell_height + descent)
+            glutBitmapCharacter(font, code)
+
+        pixels = glReadPixels(0, 0, width, image_height, GL_RED, GL_UNSIGNED_BYTE)
+        image = np.frombuffer(pixels, dtype=np.uint8).reshape(image_height, width)
+        return image, Glyphs(advances, cell_width, cell_height, descent, top)
+
+    # ------------------------------------------------------------------
+    # Strings
+    # ------------------------------------------------------------------
+
+    def _build(self, x, y, text, font, color):
+        """Quads (positions, texture coordinates, colors) of one string"""
+        glyphs = self.glyphs[font]
+        codes = np.fromiter(map(ord, text), dtype=np.int64, count=len(text))
+        codes = codes[(codes >= FIRST_CHAR) & (codes <= LAST_CHAR)]
+        advances = glyphs.advances[codes]
+        pen = x + np.concatenate(([0], np.cumsum(advances)[:-1]))
+
+        # Cell corners on screen and in the atlas
+        left, bottom = pen - PAD, np.full(len(codes), y - glyphs.descent)
+        right, top = left + glyphs.cell_width, bottom + glyphs.cell_height
+        index = codes - FIRST_CHAR
+        atlas_width, atlas_height = self.atlas_size
+        u0 = (index % ATLAS_COLUMNS) * glyphs.cell_width / atlas_width
+        v0 = (glyphs.top + (index // ATLAS_COLUMNS) * glyphs.cell_height) / atlas_height
+        u1 = u0 + glyphs.cell_width / atlas_width
+        v1 = v0 + glyphs.cell_height / atlas_height
+
+        positions = np.stack([left, bottom, right, bottom, right, top, left, top], axis=1)
+        texcoords = np.stack([u0, v0, u1, v0, u1, v1, u0, v1], axis=1)
+        colors = np.tile(np.asarray(color, dtype=np.float32), (len(codes) * 4, 1))
+        return (positions.reshape(-1, 2).astype(np.float32), texcoords.reshape(-1, 2).astype(np.float32),
+                colors)
+
+    def draw(self, x, y, text, font=GLUT_BITMAP_HELVETICA_18):
+        """Queue `text` with its baseline starting at window position (x, y)"""
+        color = tuple(glGetFloatv(GL_CURRENT_COLOR))
+        key = (x, y, text, font, color)
+        if key in self._strings:
+            self._strings.move_to_end(key)
+        else:
+            self._strings[key] = self._build(x, y, text, font, color)
+            if len(self._strings) > STRING_CACHE_SIZE:
+                self._strings.popitem(last=False)
+        self._queue.append(key)
+
+    # ------------------------------------------------------------------
+    # Passes
+    # ------------------------------------------------------------------
+
+    def begin(self):
+        """Start a UI pass: window coordinates, no depth test, nothing queued"""
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, self.width, 0, self.height)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        self._queue = []
+
+    def flush(self):
+        """Draw everything queued so far (one draw call)"""
+        if not self._queue:
+            return
+        keys = tuple(self._queue)
+        self._queue = []
+        if keys != self._batch_keys: # An unchanged UI reuses last pass's arrays
+            strings = [self._strings[key] for key in keys]
+            self._batch = tuple(np.ascontiguousarray(np.concatenate(arrays)) for arrays in zip(*strings))
+            self._batch_keys = keys
+        positions, texcoords, colors = self._batch
+
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, positions)
+        glTexCoordPointer(2, GL_FLOAT, 0, texcoords)
+        glColorPointer(colors.shape[1], GL_FLOAT, 0, colors)
+        glDrawArrays(GL_QUADS, 0, len(positions))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisable(GL_BLEND)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+
+    def end(self):
+        """Draw the queued text and restore the 3D view"""
+        self.flush()
+        glEnable(GL_DEPTH_TEST)
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()